@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from reporting.assets import process_context
+
+THUMB_SIZE = (480, 360)
+CHUNK_SIZE = 256 * 1024
+
+def make_thumbnail(source, target, size=THUMB_SIZE):
+    """Writes a downscaled JPEG of source to target (temp file + rename). Runs in a worker process."""
+    from PIL import Image, ImageOps
+    with Image.open(source) as img:
+        img.draft('RGB', size)  # Lets JPEG decoding skip most of the full-resolution work
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        img.thumbnail(size)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        img.save(tmp_path, 'JPEG', quality=80, optimize=True)
+    os.replace(tmp_path, target)
+    return target
+
+class AttachmentCache:
+    """Content-addressed disk cache for Jira attachments and their thumbnails.
+
+    Downloads are streamed to disk while hashing, then renamed to
+    objects/<hash[:2]>/<hash>. An index maps attachment id and size to the
+    hash, so unchanged attachments are never downloaded again, and thumbnails
+    are keyed by hash and size, so they are never resized again.
+    """
+
+    def __init__(self, base_dir="data/attachments", thumb_size=THUMB_SIZE):
+        self.base_dir = base_dir
+        self.thumb_size = thumb_size
+        self.objects_dir = os.path.join(base_dir, "objects")
+        self.thumbs_dir = os.path.join(base_dir, "thumbs")
+        self.index_path = os.path.join(base_dir, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.thumbs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self._index = json.load(f)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def thumb_path(self, digest):
+        w, h = self.thumb_size
+        return os.path.join(self.thumbs_dir, digest[:2], f"{digest}_{w}x{h}.jpg")
+
+    def lookup(self, attachment_id, size):
+        digest = self._index.get(f"{attachment_id}:{size}")
+        if digest and os.path.exists(self.object_path(digest)):
+            return digest
+        return None
+
+    def download(self, session, attachment_id, size, url):
+        """Streams one attachment into the cache (unless already there). Returns its hash."""
+        digest = self.lookup(attachment_id, size)
+        if digest:
+            return digest
+        sha = hashlib.sha256()
+        tmp_path = os.path.join(self.objects_dir, f"{attachment_id}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with session.get(url, stream=True) as response:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    sha.update(chunk)
+                    f.write(chunk)
+        digest = sha.hexdigest()
+        path = self.object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._index[f"{attachment_id}:{size}"] = digest
+        return digest
+
+    def save_index(self):
+        with self._lock:
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+
+    def fetch(self, session, attachments, max_workers=8, thumb_workers=2):
+        """Downloads attachments concurrently and thumbnails them in a process pool.
+
+        attachments is a list of dicts with id, size, url, filename and issue.
+        Returns them with 'path' and 'thumbnail' (file:// URL) added; failed
+        downloads are reported and left out.
+        """
+        started = time.perf_counter()
+        results = []
+
+        def download(att):
+            try:
+                return att, self.download(session, att['id'], att['size'], att['url'])
+            except Exception as e:
+                print(f"Attachment {att['filename']} ({att['issue']}) failed: {e}")
+                return att, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fetched = [(att, digest) for att, digest in pool.map(download, attachments) if digest]
+        self.save_index()
+
+        missing = {d for _, d in fetched if not os.path.exists(self.thumb_path(d))}
+        for digest in missing:
+            os.makedirs(os.path.dirname(self.thumb_path(digest)), exist_ok=True)
+        if missing:
+            # Called from pipeline, service and watcher threads, so the workers must not be forked from this process
+            with ProcessPoolExecutor(max_workers=min(thumb_workers, len(missing)), mp_context=process_context()) as pool:
+                # Absolute paths: the forkserver's working directory is wherever it was started
+                jobs = {d: pool.submit(make_thumbnail, os.path.abspath(self.object_path(d)), os.path.abspath(self.thumb_path(d)),
+                                       self.thumb_size) for d in missing}
+                for digest, job in jobs.items():
+                    try:
+                        job.result()
+                    except Exception as e:
+                        print(f"Thumbnail for {digest[:12]} failed: {e}")
+
+        for att, digest in fetched:
+            thumb = self.thumb_path(digest)
+            if os.path.exists(thumb):
+                results.append({**att, "path": self.object_path(digest), "thumbnail": pathlib.Path(thumb).resolve().as_uri()})
+        print(f"Attachments: {len(results)}/{len(attachments)} ready ({len(missing)} thumbnails made) "
+              f"in {time.perf_counter() - started:.2f}s")
+        return results
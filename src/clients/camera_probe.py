@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+RTSP_PORT = 554
+
+class CameraProbe:
+    """Checks camera reachability by opening a TCP connection to each camera's RTSP port.
+
+    All cameras are probed concurrently on one event loop, each with its own
+    timeout and at most `concurrency` connections open at once, so a site
+    with hundreds of cameras takes about one timeout rather than hundreds.
+    Results are cached for cache_ttl seconds.
+    """
+
+    def __init__(self, timeout=1.5, concurrency=100, cache_ttl=60, port=RTSP_PORT):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.cache_ttl = cache_ttl
+        self.port = port
+        self._cache = {}  # (host, port) -> (expires, result)
+
+    def _target(self, camera):
+        """(host, port) to probe, or None for a camera without an address. ip may be host:port or [IPv6]:port.
+
+        Raises ValueError when the port isn't a valid TCP port number.
+        """
+        host = camera.get('ip')
+        if not host:
+            return None
+        port = camera.get('port', self.port)
+        if host.startswith('['):
+            host, _, rest = host[1:].partition(']')
+            if rest.startswith(':'):
+                port = rest[1:]
+        elif host.count(':') == 1:
+            # More than one colon is a bare IPv6 address, which can't carry a port
+            host, port = host.split(':')
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            raise ValueError(f"Puerto inválido: {port!r}") from None
+        if not 0 < port < 65536:
+            raise ValueError(f"Puerto inválido: {port}")
+        return host, port
+
+    async def probe(self, host, port):
+        """Returns {"status", "latency_ms", "error"} for one host:port."""
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except asyncio.TimeoutError:
+            return {"status": "Offline", "latency_ms": None, "error": f"Sin respuesta en {self.timeout:g}s"}
+        except OSError as e:
+            return {"status": "Offline", "latency_ms": None, "error": e.strerror or str(e)}
+        latency = (time.perf_counter() - started) * 1000
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return {"status": "Online", "latency_ms": round(latency, 1), "error": None}
+
+    async def probe_all(self, cameras):
+        """Probes every camera and returns copies of the camera dicts with the result merged in."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        now = time.monotonic()
+
+        async def check(target):
+            cached = self._cache.get(target)
+            if cached and cached[0] > now:
+                return cached[1]
+            async with semaphore:
+                result = await self.probe(*target)
+            result["checked_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._cache[target] = (time.monotonic() + self.cache_ttl, result)
+            return result
+
+        targets, misconfigured = [], {}
+        for n, camera in enumerate(cameras):
+            try:
+                targets.append(self._target(camera))
+            except ValueError as e:
+                # Reported on that camera's row instead of stopping the probe of the others
+                print(f"Camera {camera.get('name', camera.get('ip'))} misconfigured: {e}")
+                targets.append(None)
+                misconfigured[n] = {"status": "Mal configurada", "latency_ms": None, "error": str(e)}
+        # Cameras sharing an address are probed once; those without one are left as configured
+        unique = [t for t in dict.fromkeys(targets) if t is not None]
+        results = dict(zip(unique, await asyncio.gather(*(check(t) for t in unique))))
+        return [{**camera, **results[target]} if target else {**camera, **misconfigured.get(n, {})}
+                for n, (camera, target) in enumerate(zip(cameras, targets))]
+
+    def check(self, cameras):
+        """Synchronous wrapper around probe_all for callers outside an event loop."""
+        if not cameras:
+            return []
+        return asyncio.run(self.probe_all(cameras))
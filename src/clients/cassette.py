@@ -0,0 +1,139 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+import requests
+from requests.adapters import HTTPAdapter
+
+SCRUBBED_HEADERS = {'authorization', 'cookie', 'set-cookie'}
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when a request has no recorded response."""
+
+def _body_bytes(body):
+    if body is None:
+        return b""
+    return body.encode('utf-8') if isinstance(body, str) else bytes(body)
+
+def _request_key(method, url, body):
+    return f"{method.upper()} {url} {hashlib.sha1(_body_bytes(body)).hexdigest()}"
+
+class Cassette:
+    """Records HTTP exchanges to a gzipped JSON-lines file and replays them offline.
+
+    Replay matches on method, URL and a hash of the request body; identical
+    requests are answered in the order they were recorded. Recorded latency is
+    reproduced scaled by latency_scale (0 replays at full speed).
+    """
+
+    def __init__(self, path, mode='replay', latency_scale=0.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.meta = {}
+        self.interactions = []
+        self._replay = defaultdict(deque)
+        if mode == 'replay':
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found at {self.path}")
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            self.meta = json.loads(f.readline())
+            for line in f:
+                entry = json.loads(line)
+                self._replay[entry['key']].append(entry)
+        print(f"Loaded cassette {self.path} ({sum(len(q) for q in self._replay.values())} interactions)")
+
+    def save(self):
+        if self.mode != 'record':
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps(self.meta) + "\n")
+            for entry in self.interactions:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
+        print(f"Cassette saved: {self.path} ({len(self.interactions)} interactions)")
+
+    def record(self, method, url, body, status, headers, content, elapsed):
+        self.interactions.append({
+            "key": _request_key(method, url, body),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in SCRUBBED_HEADERS},
+            "body": base64.b64encode(content).decode('ascii'),
+            "elapsed": elapsed,
+        })
+
+    def play(self, method, url, body):
+        """Returns (status, headers, content) for the next recorded response of this request."""
+        key = _request_key(method, url, body)
+        queue = self._replay.get(key)
+        if not queue:
+            raise CassetteMissError(f"No recorded response for {method} {url}")
+        # Keep the last response around so polling loops don't run dry
+        entry = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.latency_scale:
+            time.sleep(entry['elapsed'] * self.latency_scale)
+        return entry['status'], entry['headers'], base64.b64decode(entry['body'])
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that records through to the network or replays from a cassette."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == 'record':
+            started = time.perf_counter()
+            response = super().send(request, **kwargs)
+            content = response.content
+            self.cassette.record(request.method, request.url, request.body, response.status_code,
+                                 dict(response.headers), content, time.perf_counter() - started)
+            return response
+
+        status, headers, content = self.cassette.play(request.method, request.url, request.body)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        # Content is already decoded; drop encodings that would make requests decode it again
+        response.headers.pop('Content-Encoding', None)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+class CassetteHttp:
+    """httplib2.Http stand-in for googleapiclient with the same record/replay behaviour."""
+
+    def __init__(self, cassette, http=None):
+        self.cassette = cassette
+        self.http = http
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        import httplib2
+        if self.cassette.mode == 'record':
+            started = time.perf_counter()
+            response, content = self.http.request(uri, method=method, body=body, headers=headers, **kwargs)
+            self.cassette.record(method, uri, body, response.status, dict(response), content, time.perf_counter() - started)
+            return response, content
+
+        status, headers, content = self.cassette.play(method, uri, body)
+        info = dict(headers)
+        info['status'] = str(status)
+        return httplib2.Response(info), content
+
+    def __getattr__(self, name):
+        # AuthorizedHttp proxies timeout/connections/redirect_codes to the wrapped Http
+        if self.http is None:
+            raise AttributeError(name)
+        return getattr(self.http, name)
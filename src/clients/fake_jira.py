@@ -0,0 +1,170 @@
+import random
+import re
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+STATUSES = [('To Do', 'new'), ('In Progress', 'indeterminate'), ('Done', 'done'), ('Cerrado', 'done')]
+PRIORITIES = ['Highest', 'High', 'Medium', 'Low']
+ASSIGNEES = ['Ana Pérez', 'Luis Soto', 'Camila Rojas', 'Jorge Díaz']
+JIRA_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+
+class FakeJiraClient:
+    """Offline stand-in for JiraClient that serves deterministic synthetic issues.
+
+    Exposes the same surface ReportContext uses (iter_issues and
+    jira.search_issues), so services, benchmarks and soak runs can exercise
+    the full pipeline without credentials or network access.
+    """
+
+    def __init__(self, issues_per_project=200, epics_per_project=5, seed=0, base_date=None, boards_per_project=2, sprints_per_board=4,
+                 projects=()):
+        self.issues_per_project = issues_per_project
+        self.epics_per_project = epics_per_project
+        self.seed = seed
+        self.base_date = base_date or datetime(2024, 1, 1)
+        self.boards_per_project = boards_per_project
+        self.sprints_per_board = sprints_per_board
+        self.jira = self  # ReportContext calls self.jira.jira.search_issues
+        self._projects = {}
+        self._project_worklogs = {}
+        self._board_ids = {}  # (project key, board index) -> board id
+        self._boards = {}     # board id -> project key
+        self._sprints = {}  # sprint id -> (project key, sprint index)
+        # Generated up front so a site-wide worklog sync sees them before any project is queried
+        for project_key in projects:
+            self.project_issues(project_key)
+
+    def connect(self):
+        print("Connected as: Fake Jira")
+        return True
+
+    def project_issues(self, project_key):
+        if project_key not in self._projects:
+            self._projects[project_key] = self._generate(project_key)
+            self._project_worklogs[project_key] = self._generate_worklogs(self._projects[project_key])
+        return self._projects[project_key]
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, expand=None, **kwargs):
+        issues = self._match(jql)
+        if maxResults is False or maxResults is None:
+            return issues[startAt:]
+        return issues[startAt:startAt + maxResults]
+
+    def iter_issues(self, jql, fields=None, page_size=100, expand=None):
+        return iter(self._match(jql))
+
+    def boards(self, project_key=None):
+        keys = [project_key] if project_key else sorted(self._projects)
+        boards = []
+        for key in keys:
+            for n in range(self.boards_per_project):
+                board_id = self._board_ids.setdefault((key, n), len(self._board_ids) + 1)
+                self._boards[board_id] = key
+                boards.append(SimpleNamespace(id=board_id, name=f"{key} Tablero {n + 1}", type="scrum"))
+        return boards
+
+    def sprints(self, board_id, state=None):
+        project_key = self._boards[board_id]
+        sprints = []
+        for n in range(self.sprints_per_board):
+            sprint_id = board_id * 1000 + n + 1
+            self._sprints[sprint_id] = (project_key, n)
+            start = self.base_date + timedelta(days=14 * n)
+            sprint_state = 'active' if n == self.sprints_per_board - 1 else 'closed'
+            sprints.append(SimpleNamespace(
+                id=sprint_id, name=f"Sprint {n + 1}", state=sprint_state, goal=f"Objetivo del sprint {n + 1}",
+                startDate=start.strftime(JIRA_TS_FORMAT), endDate=(start + timedelta(days=14)).strftime(JIRA_TS_FORMAT)))
+        if state:
+            sprints = [sp for sp in sprints if sp.state in state.split(',')]
+        return sprints
+
+    def sprint_issues(self, sprint_id, fields=None):
+        return self.iter_issues(f'sprint = {sprint_id}', fields=fields)
+
+    def image_attachments(self, jql, limit=200):
+        return []  # Synthetic issues carry no attachments
+
+    def fetch_attachments(self, attachments, cache, max_workers=8):
+        return []
+
+    def sync_state(self, name, state):
+        return state
+
+    def updated_worklog_ids(self, since):
+        ids = [w['id'] for w in self._worklogs() if w['updated_ms'] >= since]
+        return ids, max([since] + [w['updated_ms'] for w in self._worklogs()])
+
+    def deleted_worklog_ids(self, since):
+        return [], since  # Synthetic worklogs are never deleted
+
+    def worklogs(self, ids):
+        wanted = set(ids)
+        return [w for w in self._worklogs() if w['id'] in wanted]
+
+    def _worklogs(self):
+        # Worklogs exist for the projects generated so far (see `projects`), as in worklog/list responses
+        return [w for key in sorted(self._projects) for w in self._project_worklogs[key]]
+
+    def _match(self, jql):
+        sprint = re.search(r'sprint\s*=\s*(\d+)', jql)
+        if sprint:
+            project_key, n = self._sprints.get(int(sprint.group(1)), (None, 0))
+            if project_key is None:
+                return []
+            return [i for idx, i in enumerate(self.project_issues(project_key)) if idx % self.sprints_per_board == n]
+        match = re.search(r'project\s*=\s*"?([A-Z][A-Z0-9_]*)"?', jql)
+        return self.project_issues(match.group(1)) if match else []
+
+    def _generate(self, project_key):
+        rng = random.Random(f"{self.seed}-{project_key}")
+        issues = []
+        for n in range(self.issues_per_project):
+            key = f"{project_key}-{n + 1}"
+            is_epic = n < self.epics_per_project
+            status, category = rng.choice(STATUSES)
+            created = self.base_date + timedelta(days=rng.randint(0, 120), hours=rng.randint(0, 23))
+            start = created + timedelta(days=rng.randint(0, 10))
+            due = start + timedelta(days=rng.randint(3, 60))
+            updated = created + timedelta(days=rng.randint(0, 30))
+            parent = None
+            if not is_epic and self.epics_per_project:
+                parent = SimpleNamespace(key=f"{project_key}-{rng.randint(1, self.epics_per_project)}")
+            fields = SimpleNamespace(
+                summary=f"{'Épica' if is_epic else 'Tarea'} {n + 1} de {project_key}",
+                status=SimpleNamespace(name=status, statusCategory=SimpleNamespace(key=category)),
+                priority=SimpleNamespace(name=rng.choice(PRIORITIES)),
+                assignee=SimpleNamespace(displayName=rng.choice(ASSIGNEES)),
+                issuetype=SimpleNamespace(name='Epic' if is_epic else 'Task', subtask=False),
+                parent=parent,
+                created=created.strftime(JIRA_TS_FORMAT),
+                updated=updated.strftime(JIRA_TS_FORMAT),
+                resolutiondate=updated.strftime(JIRA_TS_FORMAT) if category == 'done' else None,
+                duedate=due.strftime("%Y-%m-%d"),
+                customfield_10015=start.strftime("%Y-%m-%d"),
+                customfield_10016=rng.choice([1, 2, 3, 5, 8, None]),
+            )
+            issues.append(SimpleNamespace(id=str(len(self._projects) * 100000 + n + 1), key=key, fields=fields,
+                                          changelog=SimpleNamespace(histories=[])))
+        return issues
+
+    def _generate_worklogs(self, issues):
+        """Adds time estimates to the issues and returns worklogs shaped like worklog/list records."""
+        # Separate generator, so the issue data above stays the same with or without worklogs
+        rng = random.Random(f"{self.seed}-{issues[0].key if issues else ''}-worklogs")
+        worklogs = []
+        for issue in issues:
+            estimate = rng.choice([2, 4, 8, 16, 24]) * 3600
+            created = datetime.strptime(issue.fields.created, JIRA_TS_FORMAT)
+            spent = 0
+            for n in range(rng.randint(0, 3)):
+                started = created + timedelta(days=rng.randint(0, 30), hours=rng.randint(8, 17))
+                seconds = rng.choice([1, 2, 3, 4, 6]) * 1800
+                spent += seconds
+                worklogs.append({
+                    "id": str(int(issue.id) * 10 + n), "issueId": issue.id, "timeSpentSeconds": seconds,
+                    "author": {"displayName": rng.choice(ASSIGNEES)}, "started": started.strftime(JIRA_TS_FORMAT),
+                    "updated": started.strftime(JIRA_TS_FORMAT), "updated_ms": int(started.timestamp() * 1000),
+                })
+            issue.fields.timeoriginalestimate = estimate
+            issue.fields.timeestimate = max(estimate - spent, 0)
+        return worklogs
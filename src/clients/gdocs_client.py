@@ -3,18 +3,28 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
+from clients.cassette import CassetteHttp
 
 SCOPES = ['https://www.googleapis.com/auth/documents', 'https://www.googleapis.com/auth/drive']
 
 class GoogleDocsClient:
-    def __init__(self, credentials_path='credentials.json', token_path='token.json'):
+    def __init__(self, credentials_path='credentials.json', token_path='token.json', cassette=None):
         self.credentials_path = credentials_path
         self.token_path = token_path
+        self.cassette = cassette
         self.creds = None
         self.service = None
 
     def authenticate(self):
         """Authenticates with Google Docs API."""
+        if self.cassette is not None and self.cassette.mode == 'replay':
+            # Recorded responses need no credentials
+            self.service = build('docs', 'v1', http=CassetteHttp(self.cassette), static_discovery=True)
+            print("Replaying Google Docs API from cassette.")
+            return
+
         if os.path.exists(self.token_path):
             self.creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
         
@@ -31,7 +41,11 @@ class GoogleDocsClient:
             with open(self.token_path, 'w') as token:
                 token.write(self.creds.to_json())
 
-        self.service = build('docs', 'v1', credentials=self.creds)
+        if self.cassette is not None:
+            http = AuthorizedHttp(self.creds, http=CassetteHttp(self.cassette, httplib2.Http()))
+            self.service = build('docs', 'v1', http=http, static_discovery=True)
+        else:
+            self.service = build('docs', 'v1', credentials=self.creds)
         print("Successfully authenticated with Google Docs API.")
 
     def create_document(self, title):
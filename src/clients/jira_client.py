@@ -1,15 +1,24 @@
+import json
 from jira import JIRA
+from clients.cassette import CassetteMissError
+
+WORKLOG_BATCH = 1000  # Most IDs worklog/list accepts per request
 
 class JiraClient:
-    def __init__(self, server, email, token):
+    def __init__(self, server, email, token, transport=None):
         self.server = server
         self.email = email
         self.token = token
+        self.transport = transport  # Optional requests adapter, e.g. a CassetteAdapter
         self.jira = None
 
     def connect(self):
         try:
-            self.jira = JIRA(server=self.server, basic_auth=(self.email, self.token))
+            self.jira = JIRA(server=self.server, basic_auth=(self.email, self.token), get_server_info=self.transport is None)
+            if self.transport is not None:
+                self.jira._session.mount('https://', self.transport)
+                self.jira._session.mount('http://', self.transport)
+                self._load_server_info()
             # Test connection by getting current user
             user = self.jira.myself()
             print(f"Connected as: {user['displayName']}")
@@ -17,3 +26,129 @@ class JiraClient:
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
+
+    def _load_server_info(self):
+        """Fetches server info through the transport, as JIRA() does when get_server_info is set.
+
+        jira picks deployment-specific API paths from it, so it is recorded
+        with the rest of the traffic and replayed from the cassette; only a
+        replay of a cassette recorded without it falls back to the defaults.
+        """
+        try:
+            info = self.jira.server_info()
+        except CassetteMissError:
+            print("Cassette has no serverInfo; replaying with default API paths")
+            return
+        self.jira._version = tuple(info["versionNumbers"])
+        self.jira.deploymentType = info.get("deploymentType")
+
+    def sync_state(self, name, state):
+        """The state an incremental sync called `name` starts from (its last sync and the clock, JSON values).
+
+        Sync queries are built from it, so when recording a cassette it is
+        stored in the cassette's meta, and a replay starts from the recorded
+        state instead of the local one and the current time, asking Jira the
+        exact requests that were recorded.
+        """
+        cassette = getattr(self.transport, 'cassette', None)
+        if cassette is None:
+            return state
+        recorded = cassette.meta.setdefault('sync_state', {})
+        if cassette.mode == 'record':
+            recorded[name] = state
+            return state
+        if name not in recorded:
+            raise CassetteMissError(f"No recorded sync state for {name}")
+        return recorded[name]
+
+    def iter_issues(self, jql, fields=None, page_size=100, expand=None):
+        """Yields issues matching the JQL one page at a time instead of loading the whole result set.
+
+        Jira Cloud only pages search/jql with nextPageToken (startAt on the
+        old search API fails after the first page); Server/DC keeps startAt.
+        """
+        if getattr(self.jira, 'deploymentType', None) == 'Cloud':
+            yield from self._iter_issues_by_token(jql, fields, page_size, expand)
+            return
+        start_at = 0
+        while True:
+            page = self.jira.search_issues(jql, startAt=start_at, maxResults=page_size, fields=fields, expand=expand)
+            for issue in page:
+                yield issue
+            if len(page) < page_size:
+                break
+            start_at += len(page)
+
+    def _iter_issues_by_token(self, jql, fields, page_size, expand):
+        token = None
+        while True:
+            page = self.jira.enhanced_search_issues(jql, nextPageToken=token, maxResults=page_size, fields=fields, expand=expand)
+            yield from page
+            token = page.nextPageToken
+            if not token:
+                break
+
+    def issue_changelog(self, key, page_size=100):
+        """Every changelog history of one issue as raw dicts (search's expand=changelog stops at ~100)."""
+        histories, start_at = [], 0
+        while True:
+            page = self.jira._get_json(f'issue/{key}/changelog', params={'startAt': start_at, 'maxResults': page_size})
+            values = page.get('values', [])
+            histories.extend(values)
+            start_at += len(values)
+            if not values or page.get('isLast', start_at >= page.get('total', 0)):
+                return histories
+
+    def boards(self, project_key=None):
+        """Agile boards, optionally limited to one project."""
+        return self.jira.boards(maxResults=False, projectKeyOrID=project_key)
+
+    def sprints(self, board_id, state=None):
+        """Sprints of a board; state can be 'active', 'closed' or 'future' (comma separated)."""
+        return self.jira.sprints(board_id, maxResults=False, state=state)
+
+    def sprint_issues(self, sprint_id, fields=None):
+        return self.iter_issues(f'sprint = {sprint_id}', fields=fields)
+
+    def image_attachments(self, jql, limit=200):
+        """Metadata of the newest image attachments on issues matching the JQL."""
+        found = []
+        for issue in self.iter_issues(jql, fields=['summary', 'attachment']):
+            for att in getattr(issue.fields, 'attachment', None) or []:
+                if (getattr(att, 'mimeType', '') or '').startswith('image/'):
+                    found.append({
+                        "id": att.id, "size": att.size, "url": att.content, "filename": att.filename,
+                        "created": att.created, "issue": issue.key, "summary": issue.fields.summary,
+                    })
+        found.sort(key=lambda a: a['created'], reverse=True)
+        return found[:limit]
+
+    def fetch_attachments(self, attachments, cache, max_workers=8):
+        """Downloads attachments into an AttachmentCache through the authenticated session."""
+        return cache.fetch(self.jira._session, attachments, max_workers)
+
+    def updated_worklog_ids(self, since):
+        """IDs of worklogs created or updated since `since` (epoch ms), plus the `until` to resume from next time."""
+        return self._worklog_changes('worklog/updated', since)
+
+    def deleted_worklog_ids(self, since):
+        return self._worklog_changes('worklog/deleted', since)
+
+    def _worklog_changes(self, path, since):
+        ids, until = [], since
+        while True:
+            page = self.jira._get_json(path, params={'since': since})
+            ids.extend(v['worklogId'] for v in page.get('values', []))
+            until = page.get('until', until)
+            if page.get('lastPage', True):
+                return ids, until
+            since = until
+
+    def worklogs(self, ids):
+        """Full worklog records for the given IDs, WORKLOG_BATCH per worklog/list request."""
+        url = self.jira._get_url('worklog/list')
+        for start in range(0, len(ids), WORKLOG_BATCH):
+            response = self.jira._session.post(url, data=json.dumps({"ids": ids[start:start + WORKLOG_BATCH]}))
+            # An error body is not a list of worklogs; raising keeps WorklogStore.sync from moving its watermark
+            response.raise_for_status()
+            yield from response.json()
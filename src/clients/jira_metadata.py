@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from reporting.query_planner import START_DATE_FIELD, STORY_POINTS_FIELD, EPIC_LINK_FIELD, SPRINT_FIELD
+
+DONE_CATEGORY = 'done'
+# Only used when an issue carries no statusCategory and no metadata is loaded
+FALLBACK_DONE_STATUSES = {'done', 'completado', 'cerrado', 'finalizado'}
+
+# Default custom field IDs and the names they go by on other Jira sites
+FIELD_NAMES = {
+    START_DATE_FIELD: ('Start date', 'Fecha de inicio'),
+    STORY_POINTS_FIELD: ('Story point estimate', 'Story Points', 'Puntos de historia'),
+    EPIC_LINK_FIELD: ('Epic Link', 'Enlace de épica'),
+    SPRINT_FIELD: ('Sprint',),
+}
+
+def status_category(status):
+    """statusCategory key of a Jira status resource ('new', 'indeterminate', 'done'), or None."""
+    return getattr(getattr(status, 'statusCategory', None), 'key', None)
+
+def is_done(status, metadata=None):
+    """Whether a status counts as done: its statusCategory first, then metadata, then the fallback names."""
+    category = status_category(status)
+    if category:
+        return category == DONE_CATEGORY
+    name = getattr(status, 'name', status) or ''
+    if metadata is not None and metadata.loaded:
+        return metadata.status_category(name) == DONE_CATEGORY
+    return name.lower() in FALLBACK_DONE_STATUSES
+
+def overdue_before(today=None):
+    """ISO date that due dates must fall before to be overdue: an issue due today is not overdue yet."""
+    return (today or date.today()).isoformat()
+
+def is_overdue(due, today=None):
+    """Whether a Jira due date ('YYYY-MM-DD') has passed. SQL over stored due dates uses `due < overdue_before()`."""
+    return bool(due) and due[:10] < overdue_before(today)
+
+class JiraMetadata:
+    """Field, status and status category metadata, fetched once and cached on disk.
+
+    Lookups by name or ID are dict hits, so resolving a custom field or the
+    category of a status never costs a request once the cache is warm.
+    """
+
+    def __init__(self, jira_client, base_dir="data/metadata", ttl=24 * 3600):
+        self.jira = jira_client
+        self.ttl = ttl
+        server = getattr(jira_client, 'server', None) or 'default'
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{hashlib.sha1(server.encode()).hexdigest()[:12]}.json")
+        self.loaded = False
+        self.fields_by_id = {}
+        self.fields_by_name = {}
+        self.categories_by_status = {}  # lowercased status name and status id -> category key
+        self.names_by_category = {}
+        self._field_map = None
+
+    def load(self, refresh=False):
+        """Loads metadata from the cache, fetching it from Jira if missing, stale or refresh is set."""
+        data = None
+        if not refresh and os.path.exists(self.path) and time.time() - os.path.getmtime(self.path) < self.ttl:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        if data is None:
+            data = self._fetch()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        self._index(data)
+        return self
+
+    def _fetch(self):
+        jira = self.jira.jira
+        fields = [{"id": f['id'], "name": f['name'], "custom": f.get('custom', False)} for f in jira.fields()]
+        statuses = [{"id": s.id, "name": s.name, "category": status_category(s)} for s in jira.statuses()]
+        print(f"Fetched Jira metadata: {len(fields)} fields, {len(statuses)} statuses")
+        return {"fields": fields, "statuses": statuses}
+
+    def _index(self, data):
+        self.fields_by_id = {f['id']: f for f in data['fields']}
+        self.fields_by_name = {f['name'].lower(): f['id'] for f in data['fields']}
+        self.categories_by_status = {}
+        self.names_by_category = {}
+        for s in data['statuses']:
+            self.categories_by_status[s['name'].lower()] = s['category']
+            self.categories_by_status[str(s['id'])] = s['category']
+            self.names_by_category.setdefault(s['category'], set()).add(s['name'])
+        self._field_map = None
+        self.loaded = True
+
+    def field_id(self, name_or_id, default=None):
+        if name_or_id in self.fields_by_id:
+            return name_or_id
+        return self.fields_by_name.get(name_or_id.lower(), default)
+
+    def status_category(self, name_or_id):
+        return self.categories_by_status.get(str(name_or_id).lower())
+
+    def status_names(self, category=DONE_CATEGORY):
+        """Every status name in a category, as Jira spells them (e.g. for changelog matching)."""
+        return sorted(self.names_by_category.get(category, ()))
+
+    def field_map(self):
+        """Maps each default custom field ID to the ID this site actually uses.
+
+        A default that exists is kept; otherwise the field is looked up by its
+        known names. Unresolvable fields keep their default and are reported,
+        since requesting them would only return empty values.
+        """
+        if self._field_map is not None:
+            return self._field_map
+        resolved = {}
+        for default, names in FIELD_NAMES.items():
+            field = default if default in self.fields_by_id else next(
+                (self.fields_by_name[n.lower()] for n in names if n.lower() in self.fields_by_name), None)
+            if field is None:
+                print(f"Warning: custom field {default} ({names[0]}) not found on this Jira site")
+                field = default
+            resolved[default] = field
+        self._field_map = resolved
+        return resolved
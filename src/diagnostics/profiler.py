@@ -0,0 +1,120 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval into collapsed-stack counts.
+
+    The output ("frame;frame;frame count" per line) is the input format of
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.label = None
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            label = self.label
+            if frame is None or label is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(label)
+            self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """Profiles named stages of a report run and writes the results to output_dir.
+
+    Each stage gets its own cProfile pstats file and a tracemalloc diff of
+    its top allocation sites. With a sampling interval, a background thread
+    also records collapsed stacks for flame graphs. Stages must not nest.
+    """
+
+    def __init__(self, output_dir, sample_interval=0.005, top=25, trace_frames=10):
+        self.output_dir = output_dir
+        self.top = top
+        self.timings = {}
+        self.allocations = {}
+        os.makedirs(output_dir, exist_ok=True)
+        tracemalloc.start(trace_frames)
+        self.sampler = None
+        if sample_interval:
+            self.sampler = StackSampler(threading.get_ident(), sample_interval)
+            self.sampler.start()
+
+    @contextmanager
+    def stage(self, name):
+        profile = cProfile.Profile()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        if self.sampler is not None:
+            self.sampler.label = name
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            if self.sampler is not None:
+                self.sampler.label = None
+            _, peak = tracemalloc.get_traced_memory()
+            stats = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            self.allocations[name] = (peak, stats[:self.top])
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.pstats"))
+
+    def close(self):
+        """Stops sampling and tracing and writes summary.txt, allocations.txt and stacks.collapsed."""
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.write(os.path.join(self.output_dir, "stacks.collapsed"))
+        tracemalloc.stop()
+
+        with open(os.path.join(self.output_dir, "allocations.txt"), 'w') as f:
+            for name, (peak, stats) in self.allocations.items():
+                f.write(f"== {name} (peak {peak / 1024 / 1024:.1f} MB)\n")
+                for stat in stats:
+                    f.write(f"{stat}\n")
+                f.write("\n")
+
+        with open(os.path.join(self.output_dir, "summary.txt"), 'w') as f:
+            f.write("Stage timings\n")
+            for name, elapsed in self.timings.items():
+                f.write(f"  {name:<24} {elapsed:8.3f}s\n")
+            for name in self.timings:
+                out = io.StringIO()
+                stats = pstats.Stats(os.path.join(self.output_dir, f"{name}.pstats"), stream=out)
+                stats.sort_stats('cumulative').print_stats(self.top)
+                f.write(f"\n== {name}\n{out.getvalue()}")
+
+        total = sum(self.timings.values())
+        print(f"Profile written to {self.output_dir} ({len(self.timings)} stages, {total:.2f}s profiled)")
@@ -0,0 +1,154 @@
+import csv
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter
+import numpy as np
+from reporting.render_pool import _read_rss_mb
+from reporting.report_context import ReportContext
+from reporting.renderer import render_pdf_bytes
+
+SAMPLE_FIELDS = ("iteration", "elapsed_s", "rss_kb", "traced_kb", "fds", "objects", "figures")
+
+def _open_fds():
+    """Open file descriptors of this process, from /proc (Linux); -1 where unavailable."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except FileNotFoundError:
+        return -1
+
+def _open_figures():
+    import matplotlib.pyplot as plt
+    return len(plt.get_fignums())
+
+class SoakRun:
+    """Builds and renders reports over and over in one process and watches resource use.
+
+    Every sample_every iterations it records RSS, traced Python memory,
+    open file descriptors, live GC objects and open pyplot figures. Samples
+    taken during the first `warmup` iterations (caches and imports filling
+    up) are ignored. Over the rest, the median of pairwise slopes gives the
+    growth per iteration, so a one-off step (the allocator taking another
+    arena) doesn't read as a steady leak. The run fails when RSS or traced
+    memory grows by more than threshold_kb per iteration, descriptors keep
+    increasing or figures are left open.
+    """
+
+    def __init__(self, jira_client, projects_config, report_types, output_dir, iterations=1000, warmup=50,
+                 sample_every=10, threshold_kb=8.0, max_fd_growth=5, render=True, trace=True, top=20):
+        self.jira = jira_client
+        self.projects = projects_config
+        self.report_types = report_types
+        self.output_dir = output_dir
+        self.iterations = iterations
+        self.warmup = warmup
+        self.sample_every = sample_every
+        self.threshold_kb = threshold_kb
+        self.max_fd_growth = max_fd_growth
+        self.render = render
+        self.trace = trace
+        self.top = top
+        self.samples = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def iteration(self, n):
+        """One unit of work: a fresh ReportContext per project, every report type built and rendered."""
+        names = list(self.projects)
+        name = names[n % len(names)]
+        builder = ReportContext(self.jira, self.projects[name])
+        builder.prefetch(self.report_types)
+        for report_type in self.report_types:
+            context = builder.build(report_type)
+            if self.render:
+                render_pdf_bytes(f"{report_type}.html", context)
+
+    def sample(self, n, started):
+        gc.collect()
+        row = {
+            "iteration": n,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+            "rss_kb": int(_read_rss_mb(os.getpid()) * 1024),
+            "traced_kb": tracemalloc.get_traced_memory()[0] // 1024 if self.trace else 0,
+            "fds": _open_fds(),
+            "objects": len(gc.get_objects()),
+            "figures": _open_figures(),
+        }
+        self.samples.append(row)
+        return row
+
+    def run(self):
+        """Runs every iteration and returns the verdict (see check())."""
+        if self.trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        baseline_snapshot, baseline_types = None, None
+        try:
+            for n in range(1, self.iterations + 1):
+                self.iteration(n)
+                if n % self.sample_every and n != self.iterations:
+                    continue
+                row = self.sample(n, started)
+                if baseline_types is None and n >= self.warmup:
+                    baseline_types = Counter(type(o).__name__ for o in gc.get_objects())
+                    baseline_snapshot = tracemalloc.take_snapshot() if self.trace else None
+                print(f"[soak] {n}/{self.iterations} rss={row['rss_kb'] / 1024:.1f} MB traced={row['traced_kb'] / 1024:.1f} MB "
+                      f"fds={row['fds']} objects={row['objects']} figures={row['figures']}")
+            self._write(baseline_snapshot, baseline_types)
+        finally:
+            if self.trace:
+                tracemalloc.stop()
+        return self.check()
+
+    def growth(self, field):
+        """Theil-Sen growth of a sampled field per iteration, over the post-warmup samples (None if too few)."""
+        rows = [r for r in self.samples if r["iteration"] >= self.warmup]
+        if len(rows) < 3:
+            return None
+        x = np.array([r["iteration"] for r in rows], dtype=float)
+        y = np.array([r[field] for r in rows], dtype=float)
+        i, j = np.triu_indices(len(rows), k=1)
+        return float(np.median((y[j] - y[i]) / (x[j] - x[i])))
+
+    def check(self):
+        """{"passed", "failures", growth per iteration for each field}."""
+        growth = {field: self.growth(field) for field in ("rss_kb", "traced_kb", "fds", "objects")}
+        failures = []
+        for field in ("rss_kb", "traced_kb") if self.trace else ("rss_kb",):
+            if growth[field] is not None and growth[field] > self.threshold_kb:
+                failures.append(f"{field} grows {growth[field]:.2f} KB/iteration (limit {self.threshold_kb} KB)")
+        after_warmup = [r for r in self.samples if r["iteration"] >= self.warmup]
+        if len(after_warmup) >= 2 and after_warmup[-1]["fds"] - after_warmup[0]["fds"] > self.max_fd_growth:
+            failures.append(f"open file descriptors went from {after_warmup[0]['fds']} to {after_warmup[-1]['fds']}")
+        if self.samples and self.samples[-1]["figures"]:
+            failures.append(f"{self.samples[-1]['figures']} pyplot figures left open")
+        if growth["rss_kb"] is None:
+            failures.append(f"too few samples after warmup ({self.warmup} iterations) to measure growth")
+        result = {"passed": not failures, "failures": failures, "growth_per_iteration": growth}
+        print(f"[soak] {'PASSED' if result['passed'] else 'FAILED'}: " +
+              ", ".join(f"{k}={v:+.3f}/it" for k, v in growth.items() if v is not None))
+        for failure in failures:
+            print(f"[soak]   {failure}")
+        return result
+
+    def _write(self, baseline_snapshot, baseline_types):
+        """samples.csv (one row per sample) and growth.txt (allocation sites and object types that grew)."""
+        # Measured before any output file is opened, so those don't show up as growth
+        grown = Counter(type(o).__name__ for o in gc.get_objects()) if baseline_types is not None else None
+        sites = tracemalloc.take_snapshot().compare_to(baseline_snapshot, 'lineno')[:self.top] if baseline_snapshot else []
+        with open(os.path.join(self.output_dir, "samples.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SAMPLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.samples)
+        with open(os.path.join(self.output_dir, "growth.txt"), 'w') as f:
+            if grown is not None:
+                grown.subtract(baseline_types)
+                f.write(f"== Live object types, growth since iteration {self.warmup}\n")
+                for name, delta in grown.most_common(self.top):
+                    if delta > 0:
+                        f.write(f"{delta:+10d}  {name}\n")
+            if sites:
+                f.write(f"\n== Allocation sites, growth since iteration {self.warmup}\n")
+                for stat in sites:
+                    f.write(f"{stat}\n")
+        print(f"[soak] Samples written to {self.output_dir}")
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
-from jira_client import JiraClient
-from report_generator import ReportGenerator
+from clients.jira_client import JiraClient
+from reporting.report_generator import ReportGenerator
+from reporting.hierarchy import IssueHierarchy
 
 def generate_epic_report():
     load_dotenv()
@@ -10,38 +11,15 @@ def generate_epic_report():
     jira_email = os.getenv("JIRA_EMAIL")
     jira_token = os.getenv("JIRA_API_TOKEN")
     project_key = os.getenv("JIRA_PROJECT_KEY", "IM")
-    start_date_field = os.getenv("JIRA_START_DATE_FIELD", "customfield_10015")
 
     client = JiraClient(jira_url, jira_email, jira_token)
     if not client.connect():
         return
 
-    print(f"Fetching Epics for project: {project_key}...")
-    query = f'project = "{project_key}" AND issuetype = Epic ORDER BY created ASC'
-    epics = client.jira.search_issues(query)
-    
-    epics_data = []
-    for epic in epics:
-        # Get basic info
-        epic_name = epic.fields.summary
-        start_date = getattr(epic.fields, start_date_field, None)
-        due_date = getattr(epic.fields, "duedate", None)
-        status = epic.fields.status.name
-        
-        # Calculate progress
-        issues_in_epic = client.jira.search_issues(f'"Epic Link" = {epic.key}')
-        total = len(issues_in_epic)
-        done = len([i for i in issues_in_epic if i.fields.status.name.lower() in ['done', 'completado', 'cerrado', 'finalizado']])
-        progress = (done / total * 100) if total > 0 else 0
-        
-        epics_data.append({
-            'key': epic.key,
-            'name': epic_name,
-            'start': start_date,
-            'due': due_date,
-            'progress': progress,
-            'status': status
-        })
+    print(f"Fetching issues for project: {project_key}...")
+    # One project scan; progress is rolled up from stories and subtasks locally
+    issues = client.jira.search_issues(f'project = "{project_key}"', maxResults=False)
+    epics_data = IssueHierarchy(issues).epic_rollups(os.getenv("EPIC_ROLLUP_WEIGHT", "count"))
 
     if not epics_data:
         print("No se encontraron Épicas para reportar.")
@@ -31,7 +31,7 @@ def run():
     # 2. GENERATE PROGRESS REPORT
     print("Generating Progress Report...")
     # Calculate real progress
-    query_done = f'project = "{project_key}" AND status IN ("Done", "Completado", "Cerrado")'
+    query_done = f'project = "{project_key}" AND statusCategory = Done'
     done_issues = client.jira.search_issues(query_done)
     total_issues = client.jira.search_issues(f'project = "{project_key}"')
     
@@ -32,11 +32,11 @@ def run():
     print("Generating Progress Report (with Critical Path)...")
     
     # Calculate real progress
-    query_done = f'project = "{project_key}" AND status IN ("Done", "Completado", "Cerrado")'
+    query_done = f'project = "{project_key}" AND statusCategory = Done'
     done_issues = client.jira.search_issues(query_done)
     
     # Active issues for critical path analysis
-    query_active = f'project = "{project_key}" AND status NOT IN ("Done", "Completado", "Cerrado")'
+    query_active = f'project = "{project_key}" AND statusCategory != Done'
     active_issues = client.jira.search_issues(query_active)
     
     total_count = len(done_issues) + len(active_issues)
@@ -0,0 +1,114 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+ASSET_SCHEME = "asset:"
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
+
+def process_context():
+    """Start method for worker processes: a forkserver, or spawn where there is none.
+
+    Pools are started from service, watcher and pipeline threads, and forking
+    a threaded process can copy a lock another thread holds into the child.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    ctx = multiprocessing.get_context('forkserver')
+    # Only modules that import cleanly everywhere: a failing preload takes the server down
+    ctx.set_forkserver_preload(['reporting.charts', 'reporting.renderer'])
+    return ctx
+
+def draw_chart(fmt, dpi, figure_fn, args):
+    """Draws figure_fn(*args) and returns the encoded image bytes."""
+    import matplotlib.pyplot as plt
+    fig = figure_fn(*args)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    plt.close(fig)
+    return buf.getvalue()
+
+class AssetRegistry:
+    """In-memory store for generated images, served to WeasyPrint through a custom url_fetcher.
+
+    Templates reference assets by a synthetic ``asset:`` URL instead of
+    inlining base64 data URIs, so chart bytes go from matplotlib to the PDF
+    without temp files or encode/decode copies.
+    """
+
+    def __init__(self):
+        self._assets = {}
+        self._pending = []
+
+    def add(self, name, data, mime_type=None):
+        """Registers bytes under name and returns the URL to use in templates."""
+        if mime_type is None:
+            mime_type = MIME_TYPES.get(name.rsplit('.', 1)[-1].lower(), 'application/octet-stream')
+        # bytes are shared by BytesIO without copying; memoryviews are frozen once here
+        self._assets[name] = (bytes(data) if not isinstance(data, bytes) else data, mime_type)
+        return ASSET_SCHEME + name
+
+    def add_figure(self, name, fig, fmt='png', dpi=None):
+        """Saves a matplotlib figure straight into the registry. Returns its URL."""
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, dpi=dpi)
+        return self.add(f"{name}.{fmt}", buf.getvalue())
+
+    def add_chart(self, name, fmt, dpi, figure_fn, *args):
+        """Draws figure_fn(*args) now and registers it. Returns its URL."""
+        return self.add(f"{name}.{fmt}", draw_chart(fmt, dpi, figure_fn, args))
+
+    def add_deferred(self, name, fmt, dpi, figure_fn, *args):
+        """Reserves the URL for a chart to be drawn later by materialize()."""
+        self._pending.append((name, fmt, dpi, figure_fn, args))
+        return f"{ASSET_SCHEME}{name}.{fmt}"
+
+    def materialize(self, workers=1):
+        """Draws every deferred chart, in a process pool if workers > 1. Returns the number drawn."""
+        pending, self._pending = self._pending, []
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=process_context()) as pool:
+                images = pool.map(draw_chart, *zip(*[(fmt, dpi, fn, args) for _, fmt, dpi, fn, args in pending]))
+                for (name, fmt, _, _, _), data in zip(pending, images):
+                    self.add(f"{name}.{fmt}", data)
+        else:
+            for name, fmt, dpi, figure_fn, args in pending:
+                self.add_chart(name, fmt, dpi, figure_fn, *args)
+        return len(pending)
+
+    def get(self, url):
+        if not url.startswith(ASSET_SCHEME):
+            return None
+        return self._assets.get(url[len(ASSET_SCHEME):])
+
+    def __contains__(self, name):
+        return name in self._assets
+
+    def __len__(self):
+        return len(self._assets)
+
+    def items(self):
+        return self._assets.items()
+
+    def url_fetcher(self):
+        """Returns a WeasyPrint url_fetcher that serves registered assets and defers everything else."""
+        registry = self
+        try:
+            from weasyprint.urls import URLFetcher, URLFetcherResponse
+        except ImportError:
+            # WeasyPrint < 68 takes a plain function returning a dict
+            from weasyprint import default_url_fetcher
+
+            def fetch(url, *args, **kwargs):
+                asset = registry.get(url)
+                if asset is None:
+                    return default_url_fetcher(url, *args, **kwargs)
+                return {"file_obj": io.BytesIO(asset[0]), "mime_type": asset[1], "redirected_url": url}
+            return fetch
+
+        class AssetURLFetcher(URLFetcher):
+            def fetch(self, url, headers=None):
+                asset = registry.get(url)
+                if asset is None:
+                    return super().fetch(url, headers)
+                return URLFetcherResponse(url, body=io.BytesIO(asset[0]), headers={"Content-Type": asset[1]})
+        return AssetURLFetcher()
@@ -0,0 +1,55 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+# Figure builders are module-level functions taking plain data, so chart
+# drawing can be deferred and run in another process (see AssetRegistry.add_deferred).
+
+def gantt_figure(rows, x_range=None):
+    """Draws one Gantt tile: a bar per row (see gantt_layout.plan_gantt), shaded by its done ratio.
+
+    Height grows with the row count so labels never overlap, and tiles of
+    one plan share x_range so their time axes line up across pages.
+    """
+    fig, ax = plt.subplots(figsize=(10, max(2.0, 0.6 + 0.22 * len(rows))))
+    labels = [r['label'] for r in rows]
+    starts = mdates.date2num([r['start'] for r in rows])
+    durations = np.maximum(mdates.date2num([r['end'] for r in rows]) - starts, 1)
+    done = np.array([r['done_ratio'] for r in rows])
+
+    y = np.arange(len(rows))
+    ax.barh(y, durations, left=starts, color='#fff7a8', edgecolor='#e0d000', linewidth=0.5)
+    ax.barh(y, durations * done, left=starts, color='#ffed01')
+    ax.set_yticks(y, labels, fontsize=7 if len(rows) > 25 else 9)
+    ax.invert_yaxis()
+    ax.set_ylim(len(rows) - 0.5, -0.5)
+    if x_range:
+        ax.set_xlim(mdates.date2num(x_range[0]), mdates.date2num(x_range[1]) + 1)
+    ax.xaxis_date()
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    fig.tight_layout()
+    return fig
+
+def portfolio_figure(projects, percentages):
+    """One horizontal bar per project with its done percentage."""
+    fig, ax = plt.subplots(figsize=(10, max(2.0, 0.6 + 0.25 * len(projects))))
+    y = np.arange(len(projects))
+    ax.barh(y, [100] * len(projects), color='#f4f4f4')
+    ax.barh(y, percentages, color='#ffed01')
+    for i, pct in enumerate(percentages):
+        ax.text(min(pct, 100) + 1, i, f"{pct}%", va='center', fontsize=8)
+    ax.set_yticks(y, projects, fontsize=7 if len(projects) > 25 else 9)
+    ax.set_xlim(0, 110)
+    ax.invert_yaxis()
+    fig.tight_layout()
+    return fig
+
+def trend_figure(series):
+    """Burn-up chart: scope vs done over the snapshot series."""
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.plot(series.index, series['scope_count'], color='#adadad', label='Alcance')
+    ax.plot(series.index, series['done_count'], color='#ffed01', linewidth=2, label='Completado')
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax.legend()
+    fig.tight_layout()
+    return fig
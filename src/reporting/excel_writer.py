@@ -0,0 +1,87 @@
+from collections import Counter
+from openpyxl import Workbook
+from clients.jira_metadata import is_done, is_overdue
+from reporting.query_planner import START_DATE_FIELD, EPIC_LINK_FIELD
+CRITICAL_PRIORITIES = ['High', 'Highest', 'Critical']
+
+class ExcelReportWriter:
+    """Streams Jira issues into an .xlsx workbook using openpyxl's write-only mode.
+
+    Rows are appended as the issues arrive, so memory stays flat regardless of
+    how many issues the project has. Only the epic and status aggregates are
+    kept in memory until the end.
+    """
+
+    def __init__(self, project_config, start_field=START_DATE_FIELD, epic_field=EPIC_LINK_FIELD):
+        self.config = project_config
+        self.start_field = start_field
+        self.epic_field = epic_field
+
+    def write(self, issues, filename):
+        """Consumes an issue iterator and writes the workbook to filename."""
+        wb = Workbook(write_only=True)
+        activities = wb.create_sheet("Actividades")
+        critical = wb.create_sheet("Ruta Crítica")
+        epics_ws = wb.create_sheet("Épicas")
+        status_ws = wb.create_sheet("Estados")
+
+        activities.append(["ID", "Actividad", "Estado", "Prioridad", "Responsable", "Épica", "Inicio", "Vencimiento"])
+        critical.append(["ID", "Actividad", "Motivo"])
+
+        status_counts = Counter()
+        epic_totals = Counter()
+        epic_done = Counter()
+        epic_names = {}
+        count = 0
+
+        for issue in issues:
+            f = issue.fields
+            status = f.status.name
+            priority = getattr(f.priority, 'name', 'Medium') if getattr(f, 'priority', None) else 'Medium'
+            assignee = getattr(f.assignee, 'displayName', '') if getattr(f, 'assignee', None) else ''
+            due_str = getattr(f, 'duedate', None)
+            epic_key = self._epic_key(f)
+            done = is_done(f.status)
+
+            activities.append([
+                issue.key, f.summary, status, priority, assignee, epic_key or '',
+                getattr(f, self.start_field, None), due_str
+            ])
+
+            reason = ""
+            if not done:
+                if priority in CRITICAL_PRIORITIES:
+                    reason = f"Prioridad: {priority}"
+                if is_overdue(due_str):
+                    reason += f" | Vencida: {due_str}"
+            if reason:
+                critical.append([issue.key, f.summary, reason])
+
+            status_counts[status] += 1
+            if getattr(getattr(f, 'issuetype', None), 'name', None) == 'Epic':
+                epic_names[issue.key] = f.summary
+            elif epic_key:
+                epic_totals[epic_key] += 1
+                if done:
+                    epic_done[epic_key] += 1
+            count += 1
+
+        epics_ws.append(["Épica", "Nombre", "Completadas", "Total", "Progreso (%)"])
+        for key, total in sorted(epic_totals.items()):
+            done = epic_done[key]
+            epics_ws.append([key, epic_names.get(key, ''), done, total, round(done / total * 100, 1)])
+
+        status_ws.append(["Estado", "Cantidad", "Porcentaje (%)"])
+        for status, n in status_counts.most_common():
+            status_ws.append([status, n, round(n / count * 100, 1)])
+
+        wb.save(filename)
+        print(f"Excel report generated: {filename} ({count} issues)")
+        return filename
+
+    def _epic_key(self, fields):
+        parent = getattr(fields, 'parent', None)
+        is_subtask = getattr(getattr(fields, 'issuetype', None), 'subtask', False)
+        if parent is not None and not is_subtask:
+            return parent.key
+        return getattr(fields, self.epic_field, None)
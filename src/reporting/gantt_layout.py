@@ -0,0 +1,95 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+MAX_ROWS = 120       # Above this, bars are aggregated into lanes
+ROWS_PER_TILE = 40   # Rows drawn per page-sized chart tile
+GROUPINGS = ('auto', 'epic', 'assignee', 'month')
+
+def _bar(activity, today):
+    """(start, end) datetimes for an activity, with the same fallbacks the plain Gantt always used."""
+    start = datetime.strptime(activity['start'], "%Y-%m-%d") if activity.get('start') else today
+    end = datetime.strptime(activity['due'], "%Y-%m-%d") if activity.get('due') else start + timedelta(days=7)
+    return start, max(end, start)
+
+def _lane(activity, grouping, start):
+    if grouping == 'epic':
+        return (activity.get('epic') or '', activity.get('epic_name') or 'Sin épica')
+    if grouping == 'assignee':
+        return (activity.get('assignee') or '', activity.get('assignee') or 'Sin asignar')
+    month = start.strftime("%Y-%m")
+    return (month, month)
+
+class GanttPlan:
+    def __init__(self, tiles, grouping, activity_count, x_range):
+        self.tiles = tiles              # list of lists of row dicts (label, start, end, done_ratio, count)
+        self.grouping = grouping        # None when every activity has its own bar
+        self.activity_count = activity_count
+        self.x_range = x_range          # (min start, max end) shared by every tile
+
+    @property
+    def row_count(self):
+        return sum(len(t) for t in self.tiles)
+
+    def note(self):
+        """Caption describing how the chart was condensed, empty if it wasn't."""
+        labels = {'epic': 'épica', 'assignee': 'responsable', 'month': 'mes de inicio'}
+        parts = []
+        if self.grouping:
+            parts.append(f"{self.activity_count} actividades agrupadas por {labels[self.grouping]} en {self.row_count} carriles")
+        if len(self.tiles) > 1:
+            parts.append(f"dividido en {len(self.tiles)} páginas")
+        return "; ".join(parts).capitalize() + ("." if parts else "")
+
+def _lanes(bars, grouping):
+    lanes = defaultdict(lambda: {"start": None, "end": None, "done": 0, "count": 0})
+    for a, s, e in bars:
+        lane = lanes[_lane(a, grouping, s)]
+        lane["start"] = s if lane["start"] is None else min(lane["start"], s)
+        lane["end"] = e if lane["end"] is None else max(lane["end"], e)
+        lane["done"] += 1 if a.get('done') else 0
+        lane["count"] += 1
+    return sorted(({
+        "label": f"{name} ({lane['count']})",
+        "start": lane["start"],
+        "end": lane["end"],
+        "done_ratio": lane["done"] / lane["count"],
+        "count": lane["count"],
+    } for (_, name), lane in lanes.items()), key=lambda r: r["start"])
+
+def plan_gantt(activities, grouping='auto', max_rows=MAX_ROWS, rows_per_tile=ROWS_PER_TILE, today=None):
+    """Lays out Gantt rows so the chart stays readable however many activities there are.
+
+    Up to max_rows activities get one bar each. Beyond that they are
+    aggregated into lanes (epic, assignee or start month; 'auto' picks the
+    first that fits in max_rows) spanning each lane's earliest start to latest
+    due date, with the done ratio of its activities. Rows are then split
+    into tiles of at most rows_per_tile so each fits a page.
+    """
+    if grouping not in GROUPINGS:
+        raise ValueError(f"Unknown Gantt grouping: {grouping}")
+    today = today or datetime.now()
+    bars = [(a, *_bar(a, today)) for a in activities]
+    if not bars:
+        return GanttPlan([], None, 0, None)
+
+    if len(bars) <= max_rows:
+        used = None
+        rows = [{"label": a['key'], "start": s, "end": e, "done_ratio": 1.0 if a.get('done') else 0.0, "count": 1}
+                for a, s, e in bars]
+    else:
+        candidates = [grouping]
+        if grouping == 'auto':
+            candidates = [g for g in ('epic', 'assignee') if any(a.get(g) for a, _, _ in bars)] + ['month']
+        # 'auto' takes the first grouping that fits max_rows lanes, else the most compact one
+        options = []
+        for used in candidates:
+            rows = _lanes(bars, used)
+            if len(rows) <= max_rows:
+                break
+            options.append((used, rows))
+        else:
+            used, rows = min(options, key=lambda o: len(o[1]))
+
+    x_range = (min(r["start"] for r in rows), max(r["end"] for r in rows))
+    tiles = [rows[i:i + rows_per_tile] for i in range(0, len(rows), rows_per_tile)]
+    return GanttPlan(tiles, used, len(bars), x_range)
@@ -0,0 +1,145 @@
+from collections import defaultdict
+from clients.jira_metadata import is_done
+from reporting.query_planner import START_DATE_FIELD, STORY_POINTS_FIELD, EPIC_LINK_FIELD, ESTIMATE_FIELD
+
+WEIGHTS = ('count', 'points', 'estimate')
+
+class IssueHierarchy:
+    """Epic -> story -> subtask tree built from one project scan, with weighted rollups.
+
+    Parents come from the ``parent`` field (subtasks and team-managed
+    projects) or the Epic Link custom field (company-managed projects).
+    Rollups are computed in a single iterative post-order pass, so deep or
+    very wide trees cost O(issues) with no recursion limit.
+    """
+
+    def __init__(self, issues, epic_field=EPIC_LINK_FIELD, points_field=STORY_POINTS_FIELD, estimate_field=ESTIMATE_FIELD,
+                 start_field=START_DATE_FIELD):
+        self.nodes = {}
+        self.children = defaultdict(list)
+        for i in issues:
+            f = i.fields
+            parent = getattr(f, 'parent', None)
+            parent_key = parent.key if parent is not None else getattr(f, epic_field, None)
+            self.nodes[i.key] = {
+                "key": i.key,
+                "summary": f.summary,
+                "status": f.status.name,
+                "type": getattr(getattr(f, 'issuetype', None), 'name', None),
+                "done": is_done(f.status),
+                "parent": parent_key,
+                "start": getattr(f, start_field, None),
+                "due": getattr(f, 'duedate', None),
+                "count": 1.0,
+                "points": float(getattr(f, points_field, None) or 0),
+                "estimate": float(getattr(f, estimate_field, None) or 0),
+            }
+        for key, node in self.nodes.items():
+            # Parents outside the scanned project are treated as roots
+            if node["parent"] in self.nodes:
+                self.children[node["parent"]].append(key)
+        self.roots = [k for k, n in self.nodes.items() if n["parent"] not in self.nodes]
+        self._break_cycles()
+        self._rollups = {}
+
+    def _break_cycles(self):
+        """Makes one issue of every parent cycle a root, so no issue is left unreachable from the roots."""
+        reached = set(self._subtree(self.roots))
+        for key in self.nodes:
+            if key in reached:
+                continue
+            # Not under any root, so following parents from here ends in a cycle
+            path, seen = [], set()
+            while key not in seen:
+                seen.add(key)
+                path.append(key)
+                key = self.nodes[key]["parent"]
+            cycle = path[path.index(key):]
+            cut = min(cycle)
+            print(f"Parent cycle {' -> '.join(cycle + [key])}: treating {cut} as a root")
+            self.children[self.nodes[cut]["parent"]].remove(cut)
+            self.nodes[cut]["parent"] = None
+            self.roots.append(cut)
+            reached.update(self._subtree([cut]))
+
+    def _subtree(self, keys):
+        stack = list(keys)
+        while stack:
+            key = stack.pop()
+            yield key
+            stack.extend(self.children.get(key, ()))
+
+    def _post_order(self):
+        order, stack = [], list(self.roots)
+        while stack:
+            key = stack.pop()
+            order.append(key)
+            stack.extend(self.children.get(key, ()))
+        # Reversed pre-order visits every child before its parent
+        return reversed(order)
+
+    def rollup(self, weight='count'):
+        """Returns {key: (done_weight, total_weight)} for every issue's subtree.
+
+        A node with weighted children takes its totals from them; otherwise
+        its own weight counts, as done if the issue is done. So story points
+        on a story are used until its subtasks carry points of their own.
+        """
+        if weight not in WEIGHTS:
+            raise ValueError(f"Unknown rollup weight: {weight}")
+        if weight in self._rollups:
+            return self._rollups[weight]
+
+        totals = {}
+        for key in self._post_order():
+            done_w = total_w = 0.0
+            for child in self.children.get(key, ()):
+                c_done, c_total = totals[child]
+                done_w += c_done
+                total_w += c_total
+            if total_w == 0:
+                node = self.nodes[key]
+                total_w = node[weight]
+                done_w = total_w if node["done"] else 0.0
+            totals[key] = (done_w, total_w)
+        self._rollups[weight] = totals
+        return totals
+
+    def progress(self, key, weight='count'):
+        done_w, total_w = self.rollup(weight)[key]
+        return (done_w / total_w * 100) if total_w > 0 else 0
+
+    def epic_rollups(self, weight='count'):
+        """Epic rows in the shape ReportGenerator.generate_epic_pdf expects."""
+        totals = self.rollup(weight)
+        epics = []
+        for key, node in self.nodes.items():
+            if node["type"] != 'Epic':
+                continue
+            done_w, total_w = totals.get(key, (0.0, 0.0))
+            epics.append({
+                'key': key,
+                'name': node["summary"],
+                'start': node["start"],
+                'due': node["due"],
+                'progress': (done_w / total_w * 100) if total_w > 0 else 0,
+                'status': node["status"],
+                'done_weight': done_w,
+                'total_weight': total_w,
+                'descendants': self._descendant_count(key),
+            })
+        return epics
+
+    def epic_of(self):
+        """Maps every issue to the key of the nearest Epic at or above it (None if there is none)."""
+        epics, stack = {}, [(k, None) for k in self.roots]
+        while stack:
+            key, epic = stack.pop()
+            if self.nodes[key]["type"] == 'Epic':
+                epic = key
+            epics[key] = epic
+            stack.extend((c, epic) for c in self.children.get(key, ()))
+        return epics
+
+    def _descendant_count(self, key):
+        return sum(1 for _ in self._subtree(self.children.get(key, ())))
@@ -0,0 +1,202 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from reporting.assets import process_context
+from reporting.report_context import ReportContext, progress_stores, close_stores
+from reporting.renderer import ASSETS_KEY, render_template, render_pdf_bytes
+from storage.artifact_store import ArtifactStore
+
+_STOP = object()
+
+class Stage:
+    """One step of a Pipeline.
+
+    kind='thread' runs fn in the stage's worker threads (I/O bound work);
+    kind='process' ships each item to a process pool (CPU bound work), with
+    the stage threads only waiting on results. fn must then be picklable.
+    With fan_out=True, fn returns a list whose elements continue separately.
+    """
+
+    def __init__(self, name, fn, workers=1, kind='thread', queue_size=4, fan_out=False):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.kind = kind
+        self.queue_size = queue_size
+        self.fan_out = fan_out
+
+class StageMetrics:
+    def __init__(self, workers):
+        self.workers = workers
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0         # seconds spent inside fn
+        self.blocked_out = 0.0  # seconds waiting for room downstream (backpressure)
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def as_dict(self, elapsed):
+        return {
+            "items": self.items,
+            "errors": self.errors,
+            "busy_s": round(self.busy, 3),
+            "blocked_s": round(self.blocked_out, 3),
+            "utilisation": round(self.busy / (self.workers * elapsed), 3) if elapsed else 0.0,
+            "max_queue": self.max_queue,
+        }
+
+class Pipeline:
+    """Runs items through stages joined by bounded queues.
+
+    Stages overlap: while one item is being rendered, the next one can be
+    charted and a third fetched. A full queue blocks the upstream stage, so
+    fast fetchers cannot pile up unbounded work ahead of slow renderers.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.metrics = {s.name: StageMetrics(s.workers) for s in stages}
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """Feeds items through every stage and returns the outputs of the last one."""
+        queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages] + [queue.Queue()]
+        # Workers start on first submit, from the stage threads, so they must not be forked
+        executors = {s.name: ProcessPoolExecutor(max_workers=s.workers, mp_context=process_context())
+                     for s in self.stages if s.kind == 'process'}
+        started = time.perf_counter()
+
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            stage_threads = [
+                threading.Thread(target=self._worker, args=(stage, queues[idx], queues[idx + 1], executors.get(stage.name)),
+                                 name=f"{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            ]
+            for t in stage_threads:
+                t.start()
+            threads.append(stage_threads)
+
+        feeder = threading.Thread(target=self._feed, args=(items, queues[0], self.stages[0].workers), daemon=True)
+        feeder.start()
+
+        # Close each stage once everything upstream of it has drained
+        for idx, stage_threads in enumerate(threads):
+            for t in stage_threads:
+                t.join()
+            if idx + 1 < len(self.stages):
+                for _ in range(self.stages[idx + 1].workers):
+                    queues[idx + 1].put(_STOP)
+        feeder.join()
+        for executor in executors.values():
+            executor.shutdown()
+
+        self.elapsed = time.perf_counter() - started
+        results = []
+        while not queues[-1].empty():
+            results.append(queues[-1].get())
+        return results
+
+    def _feed(self, items, q, workers):
+        for item in items:
+            q.put(item)
+        for _ in range(workers):
+            q.put(_STOP)
+
+    def _worker(self, stage, q_in, q_out, executor):
+        m = self.metrics[stage.name]
+        while True:
+            with m._lock:
+                m.max_queue = max(m.max_queue, q_in.qsize())
+            item = q_in.get()
+            if item is _STOP:
+                break
+            t0 = time.perf_counter()
+            try:
+                out = executor.submit(stage.fn, item).result() if executor else stage.fn(item)
+            except Exception as e:
+                with m._lock:
+                    m.errors += 1
+                print(f"[{stage.name}] failed: {type(e).__name__}: {e}")
+                continue
+            t1 = time.perf_counter()
+            for o in (out if stage.fan_out else [out]):
+                if o is not None:
+                    q_out.put(o)
+            with m._lock:
+                m.items += 1
+                m.busy += t1 - t0
+                m.blocked_out += time.perf_counter() - t1
+
+    def report(self):
+        """Per-stage utilisation metrics for the last run."""
+        return {name: m.as_dict(self.elapsed) for name, m in self.metrics.items()}
+
+    def print_report(self):
+        print(f"Pipeline finished in {self.elapsed:.2f}s")
+        for name, stats in self.report().items():
+            print(f"  {name:<8} items={stats['items']:<4} errors={stats['errors']:<3} "
+                  f"busy={stats['busy_s']:.2f}s blocked={stats['blocked_s']:.2f}s "
+                  f"util={stats['utilisation']:.0%} max_queue={stats['max_queue']}")
+
+def _draw_charts(item):
+    item["context"][ASSETS_KEY].materialize()
+    return item
+
+def _render(item, pool=None):
+    context = item["context"]
+    if item.get("artifacts"):
+        if pool is not None:
+            pdf = pool.render(item["template"], context, profile=item.get("profile"))
+        else:
+            pdf = render_pdf_bytes(item["template"], context, profile=item.get("profile"))
+        store = ArtifactStore(item["artifacts"])
+        try:
+            data = {k: v for k, v in context.items() if k != ASSETS_KEY}
+            return store.record(item["project"], item["report_type"], pdf, context[ASSETS_KEY], data)
+        finally:
+            store.close()
+    if pool is not None:
+        return pool.render(item["template"], context, item["output"], item.get("profile"))
+    render_template(item["template"], context, item["output"], profile=item.get("profile"))
+    return item["output"]
+
+def report_pipeline(jira, fetch_workers=4, chart_workers=2, render_pool=None, queue_size=4, profile=None, artifacts_dir=None, **context_options):
+    """Pipeline turning (project_name, project_config, report_types) items into PDF paths.
+
+    fetch: downloads the project and builds the contexts with charts deferred (threads)
+    chart: draws the deferred charts (process pool)
+    render: lays out and writes the PDF, or stores it under artifacts_dir, in the
+    RenderPool's workers (one stage thread per worker), or in this process without one
+    """
+    def fetch(item):
+        project_name, project_config, report_types = item
+        stores = progress_stores(project_config['jira_key'], context_options.get('metadata')) if 'progress' in report_types else {}
+        try:
+            builder = ReportContext(jira, project_config, defer_charts=True, **stores, **context_options)
+            builder.prefetch(report_types)
+            date = datetime.now().strftime('%Y%m%d')
+            return [{
+                "context": builder.build(t),
+                "template": f"{t}.html",
+                "output": os.path.join(os.getcwd(), f"{project_name}_{t}_{date}.pdf"),
+                "profile": profile,
+                "project": project_name,
+                "report_type": t,
+                "artifacts": artifacts_dir,
+            } for t in report_types]
+        finally:
+            close_stores(stores)
+
+    return Pipeline([
+        Stage("fetch", fetch, workers=fetch_workers, kind='thread', queue_size=queue_size, fan_out=True),
+        Stage("chart", _draw_charts, workers=chart_workers, kind='process', queue_size=queue_size),
+        Stage("render", partial(_render, pool=render_pool), workers=render_pool.workers if render_pool else 1,
+              kind='thread', queue_size=queue_size),
+    ])
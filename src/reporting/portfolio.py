@@ -0,0 +1,137 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from reporting.assets import AssetRegistry
+from reporting.charts import portfolio_figure
+from reporting.renderer import ASSETS_KEY
+from storage.summary_index import SummaryIndex, CRITICAL_PRIORITIES
+from storage.snapshot_store import SnapshotStore
+
+ISSUE_COLUMNS = "key, summary, priority, done, due"
+DUE_SOON_DAYS = 14
+CRITICAL_PER_PROJECT = 3
+
+def _load_project(jira_client, project_key, sync, trend_days):
+    """Issues from the project's SummaryIndex (synced first if asked) plus its snapshot intervals."""
+    index = SummaryIndex(project_key)
+    try:
+        if sync:
+            index.sync(jira_client)
+        issues = pd.read_sql_query(f"SELECT {ISSUE_COLUMNS} FROM issues", index.conn)
+    finally:
+        index.close()
+    snapshots = SnapshotStore(project_key)
+    try:
+        start = (datetime.now().date() - timedelta(days=trend_days)).toordinal()
+        intervals = pd.read_sql_query("SELECT valid_from, valid_to, done FROM issue_versions WHERE valid_to > ?",
+                                      snapshots.conn, params=(start,))
+    finally:
+        snapshots.close()
+    return issues, intervals
+
+class PortfolioContext:
+    """One page over every configured project: progress, overdue and critical counts, and trend.
+
+    Projects are loaded concurrently from their local SummaryIndex (an
+    incremental sync each) and snapshot history, concatenated into one
+    frame with a project column, and every KPI comes from a single groupby
+    over that frame instead of a loop per project.
+    """
+
+    def __init__(self, jira_client, projects_config, sync=True, workers=8, chart_format='png', chart_dpi=None, trend_weeks=12):
+        self.jira = jira_client
+        self.projects = projects_config
+        self.sync = sync
+        self.workers = workers
+        self.chart_format = chart_format
+        self.chart_dpi = chart_dpi
+        self.trend_weeks = trend_weeks
+
+    def load(self):
+        """Returns (issues, intervals) frames for every project, each with a categorical project column."""
+        started = time.perf_counter()
+        names = list(self.projects)
+        keys = [self.projects[n]['jira_key'] for n in names]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(keys)))) as pool:
+            loaded = list(pool.map(lambda k: _load_project(self.jira, k, self.sync, self.trend_weeks * 7), keys))
+        category = pd.CategoricalDtype(names)
+        issues = pd.concat([f.assign(project=n) for n, (f, _) in zip(names, loaded)], ignore_index=True)
+        intervals = pd.concat([f.assign(project=n) for n, (_, f) in zip(names, loaded)], ignore_index=True)
+        issues['project'] = issues['project'].astype(category)
+        intervals['project'] = intervals['project'].astype(category)
+        print(f"Portfolio: {len(issues)} issues from {len(names)} projects loaded in {time.perf_counter() - started:.2f}s")
+        return issues, intervals
+
+    def kpis(self, issues, today):
+        """Per-project totals, done percentage, overdue, due soon and critical counts."""
+        due = pd.to_datetime(issues['due'], errors='coerce')
+        open_ = issues['done'] == 0
+        overdue = open_ & (due < today)
+        flags = pd.DataFrame({
+            "project": issues['project'],
+            "total": 1,
+            "done": issues['done'],
+            "overdue": overdue,
+            "due_soon": open_ & (due >= today) & (due < today + pd.Timedelta(days=DUE_SOON_DAYS)),
+            "critical": overdue | (open_ & issues['priority'].isin(CRITICAL_PRIORITIES)),
+        })
+        table = flags.groupby('project', observed=False).sum()
+        table['open'] = table['total'] - table['done']
+        table['percentage'] = (table['done'] * 100 // table['total'].where(table['total'] > 0)).fillna(0).astype(int)
+        return table
+
+    def trend(self, intervals, today):
+        """Done percentage per project at the end of each of the last trend_weeks weeks.
+
+        Each interval is tested against every sample day at once (a rows x
+        weeks boolean matrix), then summed per project.
+        """
+        days = np.array([(today - timedelta(weeks=w)).toordinal() for w in range(self.trend_weeks - 1, -1, -1)])
+        live = (intervals['valid_from'].to_numpy()[:, None] <= days) & (intervals['valid_to'].to_numpy()[:, None] > days)
+        done = live & intervals['done'].to_numpy().astype(bool)[:, None]
+        columns = [datetime.fromordinal(d).strftime('%Y-%m-%d') for d in days]
+        scope = pd.DataFrame(live.astype(int), columns=columns).groupby(intervals['project'], observed=False).sum()
+        closed = pd.DataFrame(done.astype(int), columns=columns).groupby(intervals['project'], observed=False).sum()
+        return (closed * 100 / scope.where(scope > 0)).round(1)
+
+    def critical_items(self, issues, today):
+        """The first few critical issues of each project, overdue ones first by due date."""
+        due = pd.to_datetime(issues['due'], errors='coerce')
+        open_ = issues['done'] == 0
+        critical = issues[(open_ & (due < today)) | (open_ & issues['priority'].isin(CRITICAL_PRIORITIES))]
+        critical = critical.assign(overdue=due[critical.index] < today)
+        top = critical.sort_values(['project', 'overdue', 'due'], ascending=[True, False, True]).groupby('project', observed=True).head(CRITICAL_PER_PROJECT)
+        return top[['project', 'key', 'summary', 'priority', 'due', 'overdue']].to_dict('records')
+
+    def build(self):
+        self.assets = AssetRegistry()
+        today = pd.Timestamp(datetime.now().date())
+        issues, intervals = self.load()
+        table = self.kpis(issues, today)
+        trend = self.trend(intervals, today.date())
+
+        # Week-over-week change in done percentage, from the trend's last two samples
+        delta = (trend.iloc[:, -1] - trend.iloc[:, -2]) if trend.shape[1] > 1 else pd.Series(np.nan, index=trend.index)
+        rows = table.join(delta.rename('trend')).reset_index()
+        rows['name'] = rows['project'].map(lambda p: self.projects[p]['name'])
+        rows['trend'] = rows['trend'].round(1).astype(object).where(rows['trend'].notna(), None)
+
+        totals = table[['total', 'done', 'open', 'overdue', 'due_soon', 'critical']].sum()
+        image = self.assets.add_chart('portfolio', self.chart_format, self.chart_dpi, portfolio_figure,
+                                      list(table.index), table['percentage'].tolist()) if len(table) else ""
+        return {
+            "title": "SafetyMind - Portafolio de Proyectos",
+            "project_name": f"Portafolio ({len(table)} proyectos)",
+            "year": datetime.now().year,
+            "report_date": datetime.now().strftime("%Y-%m-%d"),
+            "report_type": "Informe de Portafolio",
+            "totals": {k: int(v) for k, v in totals.items()},
+            "percentage": int(totals['done'] * 100 // totals['total']) if totals['total'] else 0,
+            "projects": rows.to_dict('records'),
+            "critical_items": self.critical_items(issues, today),
+            "due_soon_days": DUE_SOON_DAYS,
+            "portfolio_image": image,
+            ASSETS_KEY: self.assets,
+        }
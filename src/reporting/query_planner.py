@@ -0,0 +1,60 @@
+import time
+START_DATE_FIELD = 'customfield_10015'
+STORY_POINTS_FIELD = 'customfield_10016'
+EPIC_LINK_FIELD = 'customfield_10014'
+ESTIMATE_FIELD = 'timeoriginalestimate'
+REMAINING_ESTIMATE_FIELD = 'timeestimate'
+SPRINT_FIELD = 'customfield_10020'
+SYNC_OVERLAP_MINUTES = 5  # Re-read this much before the last sync, for clock skew between us and Jira
+
+# Issue fields each report type reads. Types missing here don't touch Jira.
+REPORT_FIELDS = {
+    'kickoff': {'summary', 'status', 'created', 'duedate', 'assignee', 'issuetype', 'parent', EPIC_LINK_FIELD, START_DATE_FIELD},
+    # assignee is only for the SummaryIndex, which is synced from this scan (see ReportContext.prefetch)
+    'progress': {'summary', 'status', 'priority', 'assignee', 'duedate', 'updated', 'created', 'resolutiondate', STORY_POINTS_FIELD,
+                 'issuetype', 'parent', EPIC_LINK_FIELD, ESTIMATE_FIELD, REMAINING_ESTIMATE_FIELD, START_DATE_FIELD},
+    # Not a report of its own: what effort figures (WorklogStore.effort) read, e.g. for the final report
+    'effort': {'summary', 'status', 'issuetype', 'parent', EPIC_LINK_FIELD, ESTIMATE_FIELD, REMAINING_ESTIMATE_FIELD},
+}
+
+def updated_since(epoch, now=None):
+    """JQL clause for issues updated since a Unix timestamp.
+
+    Absolute JQL dates are read in the Jira user's profile timezone, not the
+    host's, so the bound is written relative to now ("-N minutes"), which
+    means the same thing in every timezone.
+    """
+    now = time.time() if now is None else now
+    minutes = max(0, int(now - epoch) // 60) + SYNC_OVERLAP_MINUTES
+    return f'updated >= "-{minutes}m"'
+
+class QueryPlan:
+    def __init__(self, jql, fields, report_types):
+        self.jql = jql
+        self.fields = fields
+        self.report_types = report_types
+
+    def __repr__(self):
+        return f"QueryPlan(jql={self.jql!r}, fields={self.fields!r}, report_types={self.report_types!r})"
+
+class QueryPlanner:
+    """Works out the single project scan that covers every requested report type.
+
+    Every report view is a filter or sort over the same project, so instead of
+    one JQL per view we fetch the project once with the union of the fields
+    and let ReportContext derive each view locally.
+    """
+
+    def __init__(self, project_key, field_map=None):
+        self.project_key = project_key
+        self.field_map = field_map or {}  # default custom field ID -> this site's ID (see JiraMetadata.field_map)
+
+    def plan(self, report_types):
+        """Returns a QueryPlan, or None if none of the report types need Jira data."""
+        needed = [t for t in report_types if t in REPORT_FIELDS]
+        if not needed:
+            return None
+        fields = set()
+        for t in needed:
+            fields |= {self.field_map.get(f, f) for f in REPORT_FIELDS[t]}
+        return QueryPlan(f'project = "{self.project_key}"', ",".join(sorted(fields)), needed)
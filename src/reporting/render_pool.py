@@ -0,0 +1,176 @@
+import queue
+import resource
+import threading
+import time
+from concurrent.futures import Future
+from reporting.assets import process_context
+
+class RenderError(Exception):
+    """Raised (through the job's future) when a render job fails, times out or exceeds its memory limit."""
+
+def _read_rss_mb(pid):
+    """Resident set size of a process in MB, from /proc (Linux)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0
+
+def _worker_main(conn, template_dir, address_space_mb):
+    """Worker loop: imports WeasyPrint once, then renders jobs until told to stop."""
+    if address_space_mb:
+        # Hard backstop in case RSS polling in the parent is too slow to catch a spike
+        limit = address_space_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    import weasyprint  # noqa: F401 -- imported here so every job starts warm
+    from reporting.renderer import template_environment, render_html, write_pdf
+    env = template_environment(template_dir)
+
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        template_name, context, output_path, profile = job
+        try:
+            html_content = render_html(template_name, context, env)
+            pdf = write_pdf(html_content, context, output_path, profile)
+            conn.send(('ok', output_path if output_path else pdf))
+        except MemoryError:
+            conn.send(('error', "Out of memory while rendering"))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, ctx, template_dir, address_space_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, template_dir, address_space_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class RenderPool:
+    """Pre-started pool of isolated PDF render workers.
+
+    Each job runs in a worker process with WeasyPrint already imported. The
+    pool watches every job's RSS and wall time and kills the worker when
+    either limit is exceeded, so one pathological report cannot take down
+    the batch. Workers are recycled after max_jobs_per_worker jobs to keep
+    heap fragmentation from accumulating.
+    """
+
+    def __init__(self, workers=2, max_jobs_per_worker=50, max_rss_mb=1500, timeout=120, template_dir=None, poll_interval=0.1):
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.template_dir = template_dir
+        self.poll_interval = poll_interval
+        # Workers are started from several slot threads, so never by forking this process
+        self._ctx = process_context()
+        self._jobs = queue.Queue()
+        self._threads = []
+        for n in range(workers):
+            t = threading.Thread(target=self._slot_loop, name=f"render-slot-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, template_name, context, output_path=None, profile=None):
+        """Queues a render job. The future resolves to output_path, or to the PDF bytes if no path is given."""
+        future = Future()
+        self._jobs.put((template_name, context, output_path, profile, future))
+        return future
+
+    def render(self, template_name, context, output_path=None, profile=None):
+        return self.submit(template_name, context, output_path, profile).result()
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spawn(self):
+        # RLIMIT_AS is virtual memory; leave generous headroom over the RSS limit
+        return _Worker(self._ctx, self.template_dir, self.max_rss_mb * 2 if self.max_rss_mb else None)
+
+    def _slot_loop(self):
+        worker = self._spawn()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            template_name, context, output_path, profile, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if not worker.process.is_alive():
+                worker = self._spawn()
+
+            ok, result = self._run_job(worker, (template_name, context, output_path, profile))
+            if ok is None:
+                # Worker was killed for exceeding a limit
+                worker = self._spawn()
+                future.set_exception(RenderError(result))
+                continue
+
+            worker.jobs_done += 1
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RenderError(result))
+
+            if worker.jobs_done >= self.max_jobs_per_worker:
+                worker.stop()
+                worker = self._spawn()
+        worker.stop()
+
+    def _run_job(self, worker, payload):
+        """Sends one job and polls for its result. Returns (True|False, result) or (None, reason) if killed."""
+        try:
+            worker.conn.send(payload)
+        except (BrokenPipeError, OSError) as e:
+            worker.kill()
+            return None, f"Worker unavailable: {e}"
+
+        started = time.monotonic()
+        while True:
+            try:
+                if worker.conn.poll(self.poll_interval):
+                    status, result = worker.conn.recv()
+                    return status == 'ok', result
+            except (EOFError, OSError):
+                worker.kill()
+                return None, f"Worker died while rendering {payload[0]}"
+
+            elapsed = time.monotonic() - started
+            if self.timeout and elapsed > self.timeout:
+                worker.kill()
+                return None, f"Render of {payload[0]} exceeded {self.timeout}s"
+            rss = _read_rss_mb(worker.process.pid)
+            if self.max_rss_mb and rss > self.max_rss_mb:
+                worker.kill()
+                return None, f"Render of {payload[0]} exceeded {self.max_rss_mb} MB RSS ({rss:.0f} MB)"
@@ -0,0 +1,160 @@
+import base64
+import io
+import mimetypes
+import os
+import re
+from urllib.parse import unquote, urlparse
+from jinja2 import Environment, FileSystemLoader
+
+# Context key under which ReportContext passes its AssetRegistry to the renderer
+ASSETS_KEY = 'assets'
+
+# Output profiles: chart DPI used when building the context, plus WeasyPrint write_pdf options
+PDF_PROFILES = {
+    'screen': {
+        'chart_dpi': 80,
+        'options': {'optimize_images': True, 'jpeg_quality': 60, 'dpi': 96, 'full_fonts': False, 'uncompressed_pdf': False},
+    },
+    'print': {
+        'chart_dpi': 150,
+        'options': {'optimize_images': True, 'jpeg_quality': 85, 'dpi': 300, 'full_fonts': False, 'uncompressed_pdf': False},
+    },
+    'archive': {
+        'chart_dpi': 200,
+        'options': {'optimize_images': False, 'full_fonts': True, 'uncompressed_pdf': False, 'pdf_variant': 'pdf/a-3b'},
+    },
+}
+
+OUTPUT_FORMATS = ('pdf', 'png', 'html')
+THUMB_WIDTH = 400  # Pixel width of page thumbnails
+
+def pdf_options(profile):
+    if profile is None:
+        return {}
+    if profile not in PDF_PROFILES:
+        raise ValueError(f"Unknown PDF profile: {profile}")
+    return PDF_PROFILES[profile]['options']
+
+def chart_dpi(profile):
+    return PDF_PROFILES[profile]['chart_dpi'] if profile else None
+
+def template_environment(template_dir=None):
+    # Templates are relative to project root
+    template_dir = template_dir or os.path.join(os.getcwd(), 'templates')
+    return Environment(loader=FileSystemLoader(template_dir))
+
+def render_html(template_name, context, env=None):
+    env = env or template_environment()
+    return env.get_template(template_name).render(context)
+
+def layout(html_content, context, profile=None):
+    """Lays out the HTML once and returns the WeasyPrint Document, ready to be written."""
+    from weasyprint import HTML
+    assets = context.get(ASSETS_KEY)
+    url_fetcher = None
+    if assets is not None:
+        assets.materialize()  # Draw any charts that were deferred at build time
+        url_fetcher = assets.url_fetcher()
+    return HTML(string=html_content, url_fetcher=url_fetcher).render(**pdf_options(profile))
+
+def write_pdf(html_content, context, target=None, profile=None):
+    """Lays out the HTML and writes the PDF to target, or returns the bytes if target is None."""
+    return layout(html_content, context, profile).write_pdf(target, **pdf_options(profile))
+
+def standalone_html(html_content, context):
+    """Inlines the registered assets and local file:// images (evidence thumbnails) as data URIs.
+
+    The result can be sent on its own, e.g. by email.
+    """
+    assets = context.get(ASSETS_KEY)
+    encoded = {}
+
+    def load(url):
+        if url.startswith('file://'):
+            path = unquote(urlparse(url).path)
+            if not os.path.isfile(path):
+                return None
+            with open(path, 'rb') as f:
+                return f.read(), mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return assets.get(url) if assets is not None else None
+
+    def inline(match):
+        url = match.group(0)
+        if url not in encoded:
+            asset = load(url)
+            # Each asset is encoded once, however many times the page references it
+            encoded[url] = f"data:{asset[1]};base64,{base64.b64encode(asset[0]).decode()}" if asset else url
+        return encoded[url]
+    return re.sub(r'(?:asset:|file://)[^"\'\s)]+', inline, html_content)
+
+def page_thumbnails(pdf, width=THUMB_WIDTH):
+    """Rasterizes each page of the PDF bytes to PNG bytes, width pixels wide.
+
+    WeasyPrint dropped PNG output in v53, so pages are rasterized from the
+    PDF already written rather than laid out a second time.
+    """
+    import pypdfium2 as pdfium
+    images = []
+    document = pdfium.PdfDocument(pdf)
+    try:
+        for page in document:
+            bitmap = page.render(scale=width / page.get_width())
+            buf = io.BytesIO()
+            bitmap.to_pil().save(buf, 'PNG', optimize=True)
+            images.append(buf.getvalue())
+            page.close()
+    finally:
+        document.close()
+    return images
+
+def render_outputs(template_name, context, output_path, formats=('pdf',), env=None, profile=None):
+    """Renders the template once, lays it out once and writes every requested format.
+
+    Outputs sit next to output_path (a .pdf path): the PDF itself, page PNGs
+    as <name>_pages/page-001.png and standalone HTML as <name>.html. Chart
+    bytes come from the same AssetRegistry for all of them. Returns
+    {format: path or list of paths}.
+    """
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown output format: {', '.join(sorted(unknown))}")
+    base = os.path.splitext(output_path)[0]
+    html_content = render_html(template_name, context, env)
+    written = {}
+
+    if 'pdf' in formats or 'png' in formats:
+        pdf = write_pdf(html_content, context, profile=profile)
+        if 'pdf' in formats:
+            with open(output_path, 'wb') as f:
+                f.write(pdf)
+            written['pdf'] = output_path
+        if 'png' in formats:
+            pages_dir = f"{base}_pages"
+            os.makedirs(pages_dir, exist_ok=True)
+            written['png'] = []
+            for number, image in enumerate(page_thumbnails(pdf), 1):
+                path = os.path.join(pages_dir, f"page-{number:03d}.png")
+                with open(path, 'wb') as f:
+                    f.write(image)
+                written['png'].append(path)
+
+    if 'html' in formats:
+        written['html'] = f"{base}.html"
+        with open(written['html'], 'w', encoding='utf-8') as f:
+            f.write(standalone_html(html_content, context))
+    return written
+
+def render_template(template_name, context, output_path, env=None, profile=None, formats=('pdf',)):
+    written = render_outputs(template_name, context, output_path, formats, env, profile)
+    if 'pdf' in written:
+        size_kb = os.path.getsize(output_path) / 1024
+        print(f"Report generated: {output_path} ({size_kb:.1f} KB, profile: {profile or 'default'})")
+    if 'png' in written:
+        print(f"Page thumbnails: {len(written['png'])} pages in {os.path.splitext(output_path)[0]}_pages/")
+    if 'html' in written:
+        print(f"HTML generated: {written['html']}")
+
+def render_pdf_bytes(template_name, context, env=None, profile=None):
+    """Renders a template straight to PDF bytes, without touching the filesystem."""
+    html_content = render_html(template_name, context, env)
+    return write_pdf(html_content, context, profile=profile)
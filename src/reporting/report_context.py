@@ -1,14 +1,107 @@
-import base64
+import os
+import time
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import io
+from reporting.assets import AssetRegistry
+from reporting.charts import gantt_figure, trend_figure
+from reporting.renderer import ASSETS_KEY
+from clients.cassette import CassetteMissError
+from clients.jira_metadata import is_done, is_overdue
+import pandas as pd
+from reporting.query_planner import QueryPlanner, START_DATE_FIELD, STORY_POINTS_FIELD, EPIC_LINK_FIELD, ESTIMATE_FIELD, REMAINING_ESTIMATE_FIELD
+from reporting.hierarchy import IssueHierarchy
+from reporting.gantt_layout import plan_gantt
+from reporting.sprint_collector import SprintCollector
+from storage.snapshot_store import SnapshotStore, snapshot_rows
+from storage.changelog_store import ChangelogStore
+from storage.report_diff import ReportHistory, issue_rows
+from storage.summary_index import SummaryIndex
+
+GANTT_WORKERS = min(4, os.cpu_count() or 1)  # Processes drawing multi-page Gantt tiles
+EVIDENCE_LIMIT = 200  # Newest image attachments shown as evidence
+CRITICAL_LIMIT = 50   # Critical path rows read from the summary index
+
+def progress_stores(jira_key, metadata=None):
+    """The local stores a progress report reads its history from, as ReportContext keyword arguments.
+
+    The SummaryIndex is brought up to date by ReportContext.prefetch, from the issues it fetches anyway.
+    """
+    if metadata is not None:
+        changelog = ChangelogStore(jira_key, done_statuses=metadata.status_names('done'), todo_statuses=metadata.status_names('new'))
+    else:
+        changelog = ChangelogStore(jira_key)
+    return {"snapshot_store": SnapshotStore(jira_key), "changelog_store": changelog, "report_history": ReportHistory(),
+            "summary_index": SummaryIndex(jira_key)}
+
+def close_stores(stores):
+    """Closes the stores progress_stores opened (ReportHistory keeps no connection)."""
+    for store in stores.values():
+        if hasattr(store, 'close'):
+            store.close()
 
 class ReportContext:
-    def __init__(self, jira_client, project_config):
+    def __init__(self, jira_client, project_config, snapshot_store=None, changelog_store=None, chart_format='png', chart_dpi=None, rollup_weight='count', defer_charts=False, report_history=None,
+                 gantt_grouping='auto', camera_probe=None, attachment_cache=None, metadata=None,
+                 summary_index=None, worklog_store=None):
         self.jira = jira_client
         self.config = project_config
         self.project_key = project_config['jira_key']
+        self.snapshots = snapshot_store
+        self.changelog = changelog_store
+        self.metadata = metadata
+        self.summary_index = summary_index
+        self.worklogs = worklog_store
+        # Custom field IDs as this Jira site names them (the defaults without metadata)
+        self.fields = metadata.field_map() if metadata is not None else {}
+        self.planner = QueryPlanner(self.project_key, self.fields)
+        self.chart_format = chart_format
+        self.chart_dpi = chart_dpi
+        self.rollup_weight = rollup_weight
+        self.defer_charts = defer_charts
+        self.history = report_history
+        self.gantt_grouping = gantt_grouping
+        self.camera_probe = camera_probe
+        self.attachment_cache = attachment_cache
+        self._issues = None
+        self._fetched_types = set()
+        self._fetched_fields = set()
+
+    def prefetch(self, report_types):
+        """Fetches the project once with the fields every given report type needs."""
+        report_types = list(report_types)
+        if self.worklogs is not None and 'final' in report_types:
+            # Effort figures need the project's issues and estimates, which the final report doesn't fetch otherwise
+            report_types.append('effort')
+        plan = self.planner.plan(report_types)
+        fetched_at = time.time()
+        self._issues = list(self.jira.iter_issues(plan.jql, fields=plan.fields)) if plan else []
+        if self.summary_index is not None and 'progress' in report_types:
+            # A full scan of the project with the index's fields, so it doubles as the index's sync
+            self.summary_index.reconcile(self._issues, fetched_at)
+        self._fetched_types = set(report_types)
+        self._fetched_fields = set(plan.fields.split(',')) if plan else set()
+
+    def set_issues(self, issues, report_types=None):
+        """Uses issues already at hand (e.g. kept current by webhooks) instead of fetching them.
+
+        report_types are the types whose fields the issues were fetched with;
+        None means they carry everything any report needs.
+        """
+        self._issues = list(issues)
+        self._fetched_types = set(report_types or ())
+        self._fetched_fields = None if report_types is None else self._fields_for(report_types)
+
+    def _fields_for(self, report_types):
+        plan = self.planner.plan(list(report_types))
+        return set(plan.fields.split(',')) if plan else set()
+
+    def _project_issues(self, report_type):
+        if self._issues is None:
+            self.prefetch([report_type])
+        elif self._fetched_fields is not None and not self._fields_for([report_type]) <= self._fetched_fields:
+            # Fetched earlier for other types without some field this one reads: refetch with the union
+            print(f"Refetching {self.project_key}: {report_type} needs fields not fetched for {', '.join(sorted(self._fetched_types))}")
+            self.prefetch([*self._fetched_types, report_type])
+        return self._issues
 
     def build(self, report_type):
         """Constructs the context dictionary for the template."""
@@ -18,16 +111,21 @@ class ReportContext:
             return self._build_progress_context()
         elif report_type == 'final':
             return self._build_final_context()
+        elif report_type == 'sprint':
+            return self._build_sprint_context()
         else:
             raise ValueError(f"Unknown report type: {report_type}")
 
     def _get_base_context(self, report_title):
+        # Charts are registered here and referenced from templates by asset: URL
+        self.assets = AssetRegistry()
         return {
             "title": f"SafetyMind - {report_title}",
             "project_name": self.config['name'],
             "year": datetime.now().year,
             "report_date": datetime.now().strftime("%Y-%m-%d"),
-            "report_type": report_title
+            "report_type": report_title,
+            ASSETS_KEY: self.assets
         }
 
     def _build_kickoff_context(self):
@@ -38,23 +136,63 @@ class ReportContext:
             "activities": self._get_jira_activities()
         })
         
-        # Add Gantt Chart
-        ctx['gantt_image'] = self._generate_gantt_chart(ctx['activities'])
+        # Add Gantt Chart (one image per page-sized tile)
+        ctx['gantt_images'], ctx['gantt_note'] = self._generate_gantt_chart(ctx['activities'])
+        ctx['gantt_image'] = ctx['gantt_images'][0] if ctx['gantt_images'] else ""
         return ctx
 
     def _build_progress_context(self):
         ctx = self._get_base_context("Informe de Avance")
         
-        # Fetch active and closed issues
-        active_issues = self.jira.jira.search_issues(f'project = "{self.project_key}" AND status NOT IN ("Done", "Completado", "Cerrado")')
-        closed_issues = self.jira.jira.search_issues(f'project = "{self.project_key}" AND status IN ("Done", "Completado", "Cerrado") ORDER BY updated DESC', maxResults=10)
+        issues = self._project_issues('progress')
+        if self.summary_index is not None:
+            ctx.update(self._summary_from_index())
+        else:
+            ctx.update(self._summary_from_issues(issues))
+
+        ctx.update({
+            "blockers": self.config.get('blockers_default', 'Sin bloqueos mayores.'),
+            "epics": self._hierarchy(issues).epic_rollups(self.rollup_weight),
+        })
+
+        if self.snapshots is not None:
+            ctx.update(self._build_trend_context())
+        if self.changelog is not None:
+            ctx.update(self._build_flow_context())
+        if self.history is not None:
+            rows = self.summary_index.issue_rows() if self.summary_index is not None else issue_rows(issues)
+            ctx["changes"] = self.history.record_and_diff(self.project_key, 'progress', rows)
+        ctx["evidence"] = self._evidence_images()
+        ctx["effort"] = self._effort(issues)
+        return ctx
+
+    def _summary_from_index(self):
+        """Percentage, critical path and task lists read from the incrementally kept SummaryIndex."""
+        index = self.summary_index
+        counts = index.counts()
+        return {
+            "percentage": index.totals()["percentage"],
+            "critical_path": index.critical(limit=CRITICAL_LIMIT),
+            "critical_total": index.critical_count(),
+            "completed_tasks": [{**r, "updated": (r["updated"] or "")[:10]} for r in index.recently_closed(10)],
+            "pending_tasks": index.upcoming(),
+            "summary_priority": counts['priority'],
+            "summary_assignee": counts['assignee'],
+        }
+
+    def _summary_from_issues(self, issues):
+        """Same as _summary_from_index, computed by walking every issue."""
+        # Split the shared project scan into active and closed issues
+        done = [is_done(i.fields.status, self.metadata) for i in issues]
+        active_issues = [i for i, d in zip(issues, done) if not d]
+        closed_issues = [i for i, d in zip(issues, done) if d]
+        recent_closed = sorted(closed_issues, key=lambda i: i.fields.updated, reverse=True)[:10]
         
-        total = len(active_issues) + len(closed_issues)
+        total = len(issues)
         percentage = int((len(closed_issues) / total * 100)) if total > 0 else 0
         
         # Calculate Critical Path (High Priority + Overdue)
         critical_path = []
-        today = datetime.now()
         for i in active_issues:
             priority = getattr(i.fields.priority, 'name', 'Medium')
             due_str = getattr(i.fields, 'duedate', None)
@@ -63,77 +201,137 @@ class ReportContext:
             if priority in ['High', 'Highest', 'Critical']:
                 reason = f"Prioridad: {priority}"
             
-            if due_str:
-                due = datetime.strptime(due_str, "%Y-%m-%d")
-                if due < today:
-                    reason += f" | Vencida: {due_str}"
+            if is_overdue(due_str):
+                reason += f" | Vencida: {due_str}"
             
             if reason:
                 critical_path.append({"key": i.key, "summary": i.fields.summary, "reason": reason})
 
-        ctx.update({
+        return {
             "percentage": percentage,
-            "blockers": self.config.get('blockers_default', 'Sin bloqueos mayores.'),
             "critical_path": critical_path,
-            "completed_tasks": [{"key": i.key, "summary": i.fields.summary, "updated": i.fields.updated[:10]} for i in closed_issues],
+            "critical_total": len(critical_path),
+            "completed_tasks": [{"key": i.key, "summary": i.fields.summary, "updated": i.fields.updated[:10]} for i in recent_closed],
             "pending_tasks": [{"key": i.key, "summary": i.fields.summary, "priority": getattr(i.fields.priority, 'name', 'Normal')} for i in active_issues]
-        })
-        return ctx
+        }
+
+    def _build_flow_context(self):
+        """Syncs changed issue histories and summarises lead, cycle and time-in-status."""
+        try:
+            self.changelog.sync(self.jira)
+        except CassetteMissError as e:
+            # A replay of a cassette recorded without this sync: report from the local store as it is
+            print(f"Changelog sync for {self.project_key} not replayed ({e}); using the stored history")
+        tis = self.changelog.time_in_status()
+        return {
+            "flow": self.changelog.flow_summary(),
+            "time_in_status": [{"status": status, **row} for status, row in tis.iterrows()]
+        }
+
+    def _build_trend_context(self, days=90):
+        """Records today's snapshot and derives burn-up and velocity from the stored history."""
+        self.snapshots.record(snapshot_rows(self._project_issues('progress'), self._field(STORY_POINTS_FIELD)))
+        end = datetime.now().date()
+        start = end - timedelta(days=days)
+        series = self.snapshots.burnup(start, end)
+        velocity = self.snapshots.velocity(start, end)
+        return {
+            "trend_image": self._generate_trend_chart(series),
+            "velocity": [{"week": idx.strftime("%Y-%m-%d"), "points": round(v, 1)} for idx, v in velocity.tail(6).items()]
+        }
+
+    def _generate_trend_chart(self, series):
+        """Generates a burn-up chart (scope vs done) and returns its asset URL."""
+        return self._chart('trend', trend_figure, series)
 
     def _build_final_context(self):
         ctx = self._get_base_context("Informe Final de Cierre")
+        cameras = self.config.get('cameras', [])
+        if self.camera_probe is not None:
+            # Live status replaces whatever the config says
+            cameras = self.camera_probe.check(cameras)
         ctx.update({
             "description": self.config['description'],
-            "cameras": self.config.get('cameras', []),
+            "cameras": cameras,
+            "cameras_online": sum(1 for c in cameras if c.get('status') == 'Online'),
+            "evidence": self._evidence_images(),
+            "effort": self._effort(self._project_issues('effort')) if self.worklogs is not None else None,
             "deviations": self.config.get('deviations', []),
             "lessons_learned": self.config.get('lessons_learned', []) # Future enhancement: Add to YAML
         })
         return ctx
 
+    def _effort(self, issues):
+        """Hours logged against estimates from the WorklogStore, None unless one is set."""
+        if self.worklogs is None or not issues:
+            return None
+        hierarchy = self._hierarchy(issues)
+        epic_of = hierarchy.epic_of()
+        epics = {i.key: f"{e} {hierarchy.nodes[e]['summary']}" if e else None for i in issues for e in [epic_of.get(i.key)]}
+        frame = pd.DataFrame({
+            "issue_id": [str(i.id) for i in issues],
+            "key": [i.key for i in issues],
+            "summary": [i.fields.summary for i in issues],
+            "epic": [epics[i.key] for i in issues],
+            "estimate": [getattr(i.fields, ESTIMATE_FIELD, None) or 0 for i in issues],
+            "remaining": [getattr(i.fields, REMAINING_ESTIMATE_FIELD, None) or 0 for i in issues],
+        })
+        return self.worklogs.effort(frame)
+
+    def _evidence_images(self):
+        """Thumbnails of the project's image attachments, empty unless an attachment cache is set."""
+        if self.attachment_cache is None:
+            return []
+        jql = f'project = "{self.project_key}" AND attachments IS NOT EMPTY ORDER BY updated DESC'
+        attachments = self.jira.image_attachments(jql, limit=EVIDENCE_LIMIT)
+        return self.jira.fetch_attachments(attachments, self.attachment_cache)
+
+    def _build_sprint_context(self):
+        ctx = self._get_base_context("Informe de Sprint")
+        ctx["boards"] = SprintCollector(self.jira, points_field=self._field(STORY_POINTS_FIELD)).collect(self.project_key)
+        return ctx
+
     def _get_jira_activities(self):
-        issues = self.jira.jira.search_issues(f'project = "{self.project_key}" ORDER BY created ASC')
-        return [{
-            "key": i.key, 
-            "summary": i.fields.summary, 
-            "status": i.fields.status.name,
-            "start": getattr(i.fields, 'customfield_10015', None), # Start Date
-            "due": getattr(i.fields, 'duedate', None)
-        } for i in issues]
+        issues = sorted(self._project_issues('kickoff'), key=lambda i: i.fields.created)
+        hierarchy = self._hierarchy(issues)
+        epic_of = hierarchy.epic_of()
+        activities = []
+        for i in issues:
+            epic = epic_of.get(i.key)
+            activities.append({
+                "key": i.key, 
+                "summary": i.fields.summary, 
+                "status": i.fields.status.name,
+                "start": getattr(i.fields, self._field(START_DATE_FIELD), None), # Start Date
+                "due": getattr(i.fields, 'duedate', None),
+                "done": hierarchy.nodes[i.key]["done"],
+                "assignee": getattr(getattr(i.fields, 'assignee', None), 'displayName', None),
+                "epic": epic,
+                "epic_name": f"{epic} {hierarchy.nodes[epic]['summary']}" if epic else None,
+            })
+        return activities
+
+    def _field(self, default):
+        return self.fields.get(default, default)
+
+    def _hierarchy(self, issues):
+        return IssueHierarchy(issues, epic_field=self._field(EPIC_LINK_FIELD), points_field=self._field(STORY_POINTS_FIELD),
+                              start_field=self._field(START_DATE_FIELD))
 
     def _generate_gantt_chart(self, activities):
-        """Generates a Gantt chart and returns base64 string."""
-        data = []
-        for a in activities:
-            s_str = a.get('start')
-            d_str = a.get('due')
-            
-            # Simple fallback logic for demonstration
-            if s_str:
-                s_dt = datetime.strptime(s_str, "%Y-%m-%d")
-            else:
-                s_dt = datetime.now()
-                
-            if d_str:
-                d_dt = datetime.strptime(d_str, "%Y-%m-%d")
-            else:
-                d_dt = s_dt + timedelta(days=7)
-                
-            data.append((a['key'], s_dt, d_dt))
-
-        if not data:
-            return ""
-
-        fig, ax = plt.subplots(figsize=(10, 6))
-        names = [x[0] for x in data]
-        starts = [x[1] for x in data]
-        durations = [(x[2] - x[1]).days for x in data]
-        
-        ax.barh(names, durations, left=starts, color='#ffed01')
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close(fig)
-        buf.seek(0)
-        return base64.b64encode(buf.read()).decode('utf-8')
+        """Generates the Gantt tiles. Returns (asset URLs, caption describing any aggregation)."""
+        plan = plan_gantt(activities, self.gantt_grouping)
+        if len(plan.tiles) == 1:
+            return [self._chart('gantt', gantt_figure, plan.tiles[0], plan.x_range)], plan.note()
+        urls = [self.assets.add_deferred(f"gantt_{n + 1}", self.chart_format, self.chart_dpi, gantt_figure, tile, plan.x_range)
+                for n, tile in enumerate(plan.tiles)]
+        if not self.defer_charts:
+            # Tiles are independent, so draw them side by side
+            self.assets.materialize(workers=GANTT_WORKERS)
+        return urls, plan.note()
+
+    def _chart(self, name, figure_fn, *args):
+        if self.defer_charts:
+            # Only the URL is needed now; the pipeline's chart stage draws it later
+            return self.assets.add_deferred(name, self.chart_format, self.chart_dpi, figure_fn, *args)
+        return self.assets.add_chart(name, self.chart_format, self.chart_dpi, figure_fn, *args)
@@ -1,6 +1,9 @@
 import markdown
 from weasyprint import HTML
-from gdocs_client import GoogleDocsClient
+from clients.gdocs_client import GoogleDocsClient
+from reporting.assets import AssetRegistry
+from reporting.query_planner import START_DATE_FIELD
+from clients.jira_metadata import is_done
 
 class ReportGenerator:
     def __init__(self, data):
@@ -149,6 +152,15 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
     def generate_gantt_chart(self, epics_data, output_path="gantt.png"):
         """Generates a Gantt chart using matplotlib and saves it as an image."""
         import matplotlib.pyplot as plt
+
+        fig = self._plot_gantt(epics_data)
+        fig.savefig(output_path)
+        plt.close(fig)
+        return output_path
+
+    def _plot_gantt(self, epics_data):
+        """Draws the epic Gantt chart and returns the matplotlib figure."""
+        import matplotlib.pyplot as plt
         import matplotlib.dates as mdates
         from datetime import datetime, timedelta
 
@@ -206,23 +218,21 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
         plt.grid(axis='x', linestyle='--', alpha=0.5)
         plt.legend()
         plt.tight_layout()
-        
-        plt.savefig(output_path)
-        plt.close()
-        return output_path
+        return plt.gcf()
 
-    def generate_epic_pdf(self, epics_data, filename="epic_progress_report.pdf"):
+    def generate_epic_pdf(self, epics_data, filename="epic_progress_report.pdf", chart_format="png"):
         """Generates a PDF report for Epics with an embedded Gantt chart."""
-        import base64
+        import matplotlib.pyplot as plt
         from datetime import datetime
         
         md_content = self.generate_epic_markdown(epics_data)
         html_content = markdown.markdown(md_content)
         
-        # Generate chart
-        gantt_path = self.generate_gantt_chart(epics_data)
-        with open(gantt_path, "rb") as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode()
+        # Generate chart straight into memory; WeasyPrint fetches it from the registry
+        assets = AssetRegistry()
+        fig = self._plot_gantt(epics_data)
+        gantt_url = assets.add_figure('gantt', fig, chart_format)
+        plt.close(fig)
 
         # Prepare HTML body content
         processed_html = html_content.replace('<h3>', '<div class="epic-card"><h3>')
@@ -259,7 +269,7 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
             
             <div class="gantt-container">
                 <h3>Cronograma y Progreso de Épicas</h3>
-                <img src="data:image/png;base64,{img_base64}">
+                <img src="{gantt_url}">
             </div>
 
             {processed_html}
@@ -270,7 +280,7 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
         </body>
         </html>
         """
-        HTML(string=full_html).write_pdf(filename)
+        HTML(string=full_html, url_fetcher=assets.url_fetcher()).write_pdf(filename)
         print(f"PDF de Épicas generado: {filename}")
 
     def _generate_critical_path_html(self, issues):
@@ -293,7 +303,7 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
             
             if due_date_str:
                 due_date = datetime.strptime(due_date_str, "%Y-%m-%d")
-                if due_date < today and issue.fields.status.name not in ['Done', 'Completado', 'Cerrado']:
+                if due_date < today and not is_done(issue.fields.status):
                     is_critical = True
                     reason += f" | Vencida: {due_date_str}"
 
@@ -305,29 +315,30 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
         
         return "<ul>" + "".join(critical_items) + "</ul>"
 
-    def generate_kickoff_report(self, project_info, activities, filename="kickoff_report.pdf"):
+    def generate_kickoff_report(self, project_info, activities, filename="kickoff_report.pdf", chart_format="png", start_field=START_DATE_FIELD):
         """Generates a Kickoff report with architecture, activity plan and Gantt chart."""
+        import matplotlib.pyplot as plt
         from datetime import datetime
-        import base64
         
         # Format activities for Gantt chart generation
         # Assuming 'activities' are Jira Issue objects
         gantt_data = []
         for a in activities:
              # simple mapping for Gantt
-             start = getattr(a.fields, 'customfield_10015', None) # Start Date
+             start = getattr(a.fields, start_field, None) # Start Date
              due = getattr(a.fields, 'duedate', None)
              gantt_data.append({
                  'name': a.key, # Use key for brevity in chart
                  'start': start,
                  'due': due,
-                 'progress': 0 if a.fields.status.name not in ['Done', 'Completado'] else 100
+                 'progress': 100 if is_done(a.fields.status) else 0
              })
 
         # Generate Gantt Chart
-        gantt_path = self.generate_gantt_chart(gantt_data, "kickoff_gantt.png")
-        with open(gantt_path, "rb") as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode()
+        assets = AssetRegistry()
+        fig = self._plot_gantt(gantt_data)
+        gantt_url = assets.add_figure('kickoff_gantt', fig, chart_format)
+        plt.close(fig)
 
         full_html = f"""
         <html>
@@ -426,7 +437,7 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
 
             <h2>3. Cronograma del Proyecto (Ganta)</h2>
             <div class="gantt-container">
-                <img src="data:image/png;base64,{img_base64}">
+                <img src="{gantt_url}">
             </div>
 
             <h2>4. Plan de Actividades (Jira)</h2>
@@ -445,7 +456,7 @@ Este informe muestra el progreso de las iniciativas de alto nivel (Épicas) en J
         </body>
         </html>
         """
-        HTML(string=full_html).write_pdf(filename)
+        HTML(string=full_html, url_fetcher=assets.url_fetcher()).write_pdf(filename)
         print(f"Kickoff Report generado: {filename}")
 
     def generate_progress_status_report(self, progress_data, increments, blockers, all_active_issues=[], filename="avance_report.pdf"):
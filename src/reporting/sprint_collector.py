@@ -0,0 +1,95 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from jira.exceptions import JIRAError
+from clients.jira_metadata import is_done
+from reporting.query_planner import STORY_POINTS_FIELD
+
+class SprintCollector:
+    """Collects sprint summaries for every board of a project through the Agile API.
+
+    Boards and sprints are fetched concurrently under a bounded thread pool.
+    Closed sprints never change, so their summaries are cached on disk
+    permanently and only active sprints hit Jira on later runs.
+    """
+
+    def __init__(self, jira_client, cache_dir="data/sprints", max_workers=8, history=3, points_field=STORY_POINTS_FIELD):
+        self.jira = jira_client
+        self.points_field = points_field
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.history = history
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def collect(self, project_key):
+        """Returns a list of boards, each with its active sprints and last `history` closed sprints."""
+        # Kanban boards have no sprints; the Agile API answers 400 when asked for them
+        boards = [b for b in self.jira.boards(project_key) if getattr(b, 'type', None) != 'kanban']
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            sprint_lists = [(b, s) for b, s in zip(boards, pool.map(self._board_sprints, boards)) if s is not None]
+            boards = [b for b, _ in sprint_lists]
+
+            jobs = []
+            for board, sprints in sprint_lists:
+                active = [s for s in sprints if s.state == 'active']
+                closed = [s for s in sprints if s.state == 'closed'][-self.history:] if self.history else []
+                for sprint in active + closed[::-1]:
+                    jobs.append((board, pool.submit(self._sprint_summary, sprint)))
+
+            results = {b.id: {"id": b.id, "name": b.name, "sprints": []} for b in boards}
+            for board, future in jobs:
+                results[board.id]["sprints"].append(future.result())
+        return [results[b.id] for b in boards]
+
+    def _board_sprints(self, board):
+        """Active and closed sprints of a board, or None when the board doesn't support sprints."""
+        try:
+            return list(self.jira.sprints(board.id, state='active,closed'))
+        except JIRAError as e:
+            print(f"Skipping board {board.name}: {e.text or e.status_code}")
+            return None
+
+    def _cache_path(self, sprint_id):
+        return os.path.join(self.cache_dir, f"{sprint_id}.json")
+
+    def _sprint_summary(self, sprint):
+        closed = sprint.state == 'closed'
+        path = self._cache_path(sprint.id)
+        if closed and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        issues = [{
+            "key": i.key,
+            "summary": i.fields.summary,
+            "status": i.fields.status.name,
+            "assignee": getattr(i.fields.assignee, 'displayName', '') if getattr(i.fields, 'assignee', None) else '',
+            "points": float(getattr(i.fields, self.points_field, None) or 0),
+            "done": is_done(i.fields.status),
+        } for i in self.jira.sprint_issues(sprint.id, fields=f"summary,status,assignee,{self.points_field}")]
+
+        done = [i for i in issues if i["done"]]
+        total_points = sum(i["points"] for i in issues)
+        done_points = sum(i["points"] for i in done)
+        summary = {
+            "id": sprint.id,
+            "name": sprint.name,
+            "state": sprint.state,
+            "goal": getattr(sprint, 'goal', '') or '',
+            "start": (getattr(sprint, 'startDate', None) or '')[:10],
+            "end": (getattr(sprint, 'endDate', None) or '')[:10],
+            "total": len(issues),
+            "done": len(done),
+            "total_points": total_points,
+            "done_points": done_points,
+            "percentage": int(len(done) / len(issues) * 100) if issues else 0,
+            "incomplete": [i for i in issues if not i["done"]],
+        }
+
+        if closed:
+            # Write-then-rename so a concurrent run never reads a half-written cache file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        return summary
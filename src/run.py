@@ -1,11 +1,24 @@
 import os
 import argparse
 import yaml
+from contextlib import nullcontext
 from datetime import datetime
 from dotenv import load_dotenv
 from clients.jira_client import JiraClient
-from reporting.report_context import ReportContext 
-from jinja2 import Environment, FileSystemLoader
+from clients.cassette import Cassette, CassetteAdapter
+from clients.camera_probe import CameraProbe
+from clients.attachments import AttachmentCache
+from clients.jira_metadata import JiraMetadata
+from reporting.report_context import ReportContext, progress_stores, close_stores
+from reporting.excel_writer import ExcelReportWriter
+from reporting.renderer import ASSETS_KEY, render_template, render_pdf_bytes, chart_dpi
+from reporting.render_pool import RenderPool, RenderError
+from reporting.pipeline import report_pipeline
+from reporting.portfolio import PortfolioContext
+from reporting.query_planner import START_DATE_FIELD, EPIC_LINK_FIELD
+from storage.artifact_store import ArtifactStore
+from storage.worklog_store import WorklogStore
+from diagnostics.profiler import Profiler
 
 # Load Env
 load_dotenv()
@@ -14,51 +27,202 @@ def load_config(config_path="config/projects.yaml"):
     with open(config_path, 'r') as file:
         return yaml.safe_load(file)
 
-def get_jira_client():
+def get_jira_client(cassette=None):
     jira_url = os.getenv("JIRA_URL")
     jira_email = os.getenv("JIRA_EMAIL")
     jira_token = os.getenv("JIRA_API_TOKEN")
-    client = JiraClient(jira_url, jira_email, jira_token)
+    transport = None
+    if cassette is not None:
+        transport = CassetteAdapter(cassette)
+        if cassette.mode == 'record':
+            cassette.meta['server'] = jira_url
+        else:
+            # Replays run offline without credentials
+            jira_url = cassette.meta.get('server', jira_url)
+    client = JiraClient(jira_url, jira_email, jira_token, transport)
     if not client.connect():
         raise Exception("Failed to connect to Jira")
     return client
 
-def render_template(template_name, context, output_path):
-    # Templates are now relative to project root
-    template_dir = os.path.join(os.getcwd(), 'templates')
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template(template_name)
-    html_content = template.render(context)
-    
-    from weasyprint import HTML
-    HTML(string=html_content).write_pdf(output_path)
-    print(f"Report generated: {output_path}")
-
 def main():
     parser = argparse.ArgumentParser(description="SafetyMind Report Automation CLI")
-    parser.add_argument("--project", required=True, help="Project Key (e.g., GMF, IM)")
-    parser.add_argument("--type", required=True, choices=['kickoff', 'progress', 'final'], help="Type of report to generate")
+    parser.add_argument("--project", nargs='+', help="Project Key(s) (e.g., GMF, IM); several projects run as an overlapped pipeline")
+    parser.add_argument("--type", required=True, nargs='+', choices=['kickoff', 'progress', 'final', 'sprint', 'portfolio'], help="Type(s) of report to generate; several types share one Jira fetch (portfolio covers the given projects, or all of them)")
+    parser.add_argument("--format", default="pdf", choices=['pdf', 'xlsx'], help="Output format")
+    parser.add_argument("--output", nargs='+', default=['pdf'], choices=['pdf', 'png', 'html'], help="Outputs from one layout pass: PDF, per-page PNG thumbnails and/or standalone HTML (ignored with --store)")
+    parser.add_argument("--chart-format", default="png", choices=['png', 'svg'], help="Chart image format embedded in PDFs")
+    parser.add_argument("--pdf-profile", choices=['screen', 'print', 'archive'], help="Output size/quality profile for PDFs")
+    parser.add_argument("--rollup-weight", default="count", choices=['count', 'points', 'estimate'], help="Weighting for epic progress rollups")
+    parser.add_argument("--gantt-group", default="auto", choices=['auto', 'epic', 'assignee', 'month'], help="Lanes used when a Gantt chart has too many activities to draw one bar each")
+    parser.add_argument("--probe-cameras", action="store_true", help="Check each camera's RTSP port and show its live status in final reports")
+    parser.add_argument("--camera-timeout", type=float, default=1.5, help="Seconds to wait for each camera's RTSP port with --probe-cameras")
+    parser.add_argument("--evidence", action="store_true", help="Include image attachments as evidence photos in progress and final reports")
+    parser.add_argument("--effort", action="store_true", help="Include hours logged vs estimates in progress and final reports (worklogs are bulk-synced into data/worklogs)")
+    parser.add_argument("--render-workers", type=int, default=0, help="Render PDFs in N isolated worker processes (0 = in-process)")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Concurrent project fetches in pipeline mode")
+    parser.add_argument("--chart-workers", type=int, default=2, help="Chart processes in pipeline mode")
+    parser.add_argument("--store", action="store_true", help="Keep outputs in the content-addressed artifact store (data/artifacts) instead of loose files")
+    parser.add_argument("--profile", action="store_true", help="Profile the run (cProfile, tracemalloc, sampled stacks); results go to <project>_<date>.profile/")
+    parser.add_argument("--profile-interval", type=float, default=5.0, help="Stack sampling interval in ms for --profile (0 = no sampling)")
+    parser.add_argument("--cached", action="store_true", help="Build the portfolio from the local summary indexes without syncing them from Jira")
+    parser.add_argument("--cassette", help="Record/replay Jira traffic to/from this .jsonl.gz file")
+    parser.add_argument("--cassette-mode", default="replay", choices=['record', 'replay'], help="Cassette mode")
+    parser.add_argument("--cassette-latency", type=float, default=0.0, help="Replay latency as a fraction of the recorded latency (0 = full speed)")
     
     args = parser.parse_args()
+    portfolio = 'portfolio' in args.type
+    args.type = [t for t in args.type if t != 'portfolio']
+    if args.type and not args.project:
+        parser.error("--project is required for kickoff, progress, final and sprint reports")
     
     # 1. Load Config
     config = load_config()
-    if args.project not in config['projects']:
-        print(f"Project {args.project} not found in config/projects.yaml")
+    missing = [p for p in args.project or [] if p not in config['projects']]
+    if missing:
+        print(f"Project {', '.join(missing)} not found in config/projects.yaml")
         return
-        
-    project_config = config['projects'][args.project]
     
     # 2. Connect to Jira
-    jira = get_jira_client()
-    
-    # 3. Build Context (Data Model)
-    context_builder = ReportContext(jira, project_config)
-    context = context_builder.build(args.type)
-    
-    # 4. Render Template (View)
-    output_filename = f"{args.project}_{args.type}_{datetime.now().strftime('%Y%m%d')}.pdf"
-    render_template(f"{args.type}.html", context, output_filename)
+    cassette = Cassette(args.cassette, args.cassette_mode, args.cassette_latency) if args.cassette else None
+    jira = get_jira_client(cassette) if args.type or not args.cached else None
+    try:
+        if portfolio:
+            generate_portfolio(args, jira, config)
+        if not args.type:
+            return
+        metadata = load_metadata(jira)
+        worklogs = load_worklogs(jira) if args.effort and {'progress', 'final'} & set(args.type) else None
+        if len(args.project) > 1 and args.format == 'pdf' and args.output == ['pdf'] and not args.profile:
+            generate_pipeline(args, jira, config, metadata, worklogs)
+        else:
+            for project in args.project:
+                generate(args, jira, project, config['projects'][project], metadata, worklogs)
+    finally:
+        if cassette is not None:
+            cassette.save()
+
+def load_metadata(jira):
+    """Field and status metadata (cached on disk for a day), or None if Jira won't serve it."""
+    try:
+        return JiraMetadata(jira).load()
+    except Exception as e:
+        print(f"Jira metadata unavailable, using default field IDs: {e}")
+        return None
+
+def load_worklogs(jira):
+    """The site's WorklogStore, synced once for every project in this run."""
+    worklogs = WorklogStore(getattr(jira, 'server', None))
+    worklogs.sync(jira)
+    return worklogs
+
+def camera_probe(args):
+    return CameraProbe(timeout=args.camera_timeout) if 'final' in args.type and args.probe_cameras else None
+
+def generate_portfolio(args, jira, config):
+    """Renders one portfolio report over the given projects, or every configured one."""
+    projects = {p: config['projects'][p] for p in args.project or config['projects']}
+    builder = PortfolioContext(jira, projects, sync=not args.cached, workers=args.fetch_workers,
+                               chart_format=args.chart_format, chart_dpi=chart_dpi(args.pdf_profile))
+    output_filename = f"portfolio_{datetime.now().strftime('%Y%m%d')}.pdf"
+    render_template("portfolio.html", builder.build(), output_filename, profile=args.pdf_profile, formats=args.output)
+
+def generate_pipeline(args, jira, config, metadata=None, worklogs=None):
+    """Overlaps fetching, charting and rendering across several projects."""
+    pool = RenderPool(workers=args.render_workers) if args.render_workers else None
+    try:
+        pipeline = report_pipeline(
+            jira, fetch_workers=args.fetch_workers, chart_workers=args.chart_workers, render_pool=pool,
+            profile=args.pdf_profile, artifacts_dir="data/artifacts" if args.store else None,
+            chart_format=args.chart_format, chart_dpi=chart_dpi(args.pdf_profile), rollup_weight=args.rollup_weight,
+            gantt_grouping=args.gantt_group, camera_probe=camera_probe(args),
+            attachment_cache=AttachmentCache() if args.evidence else None, metadata=metadata, worklog_store=worklogs)
+        pipeline.run((p, config['projects'][p], args.type) for p in args.project)
+        pipeline.print_report()
+    finally:
+        if pool is not None:
+            pool.close()
+
+def generate(args, jira, project, project_config, metadata=None, worklogs=None):
+    """Builds and renders every requested report type for one project."""
+    # Excel exports stream straight from Jira, no template involved
+    if args.format == 'xlsx':
+        output_filename = f"{project}_issues_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        issues = jira.iter_issues(f'project = "{project_config["jira_key"]}" ORDER BY created ASC')
+        fields = metadata.field_map() if metadata is not None else {}
+        writer = ExcelReportWriter(project_config, fields.get(START_DATE_FIELD, START_DATE_FIELD), fields.get(EPIC_LINK_FIELD, EPIC_LINK_FIELD))
+        writer.write(issues, output_filename)
+        return
+
+    # Profiling runs every stage in this process, with charts deferred so they are measured on their own
+    profiler = None
+    if args.profile:
+        profiler = Profiler(f"{project}_{datetime.now().strftime('%Y%m%d')}.profile", args.profile_interval / 1000)
+    stage = profiler.stage if profiler else (lambda name: nullcontext())
+
+    pool = store = None
+    stores = {}
+    try:
+        # 3. Build Context (Data Model)
+        stores = progress_stores(project_config['jira_key'], metadata) if 'progress' in args.type else {}
+        context_builder = ReportContext(jira, project_config, chart_format=args.chart_format, chart_dpi=chart_dpi(args.pdf_profile),
+                                        rollup_weight=args.rollup_weight, defer_charts=profiler is not None, gantt_grouping=args.gantt_group,
+                                        camera_probe=camera_probe(args), attachment_cache=AttachmentCache() if args.evidence else None,
+                                        metadata=metadata, worklog_store=worklogs, **stores)
+        with stage("fetch"):
+            context_builder.prefetch(args.type)
+
+        # Page thumbnails and HTML come from the in-process layout, so they bypass the render pool
+        extra_outputs = args.output != ['pdf'] and not args.store
+        pool = RenderPool(workers=args.render_workers) if args.render_workers and not profiler and not extra_outputs else None
+        store = ArtifactStore() if args.store else None
+        jobs = []
+        for report_type in args.type:
+            with stage(f"{report_type}.build"):
+                context = context_builder.build(report_type)
+            if profiler is not None:
+                with stage(f"{report_type}.charts"):
+                    context[ASSETS_KEY].materialize()
+        
+            # 4. Render Template (View)
+            output_filename = f"{project}_{report_type}_{datetime.now().strftime('%Y%m%d')}.pdf"
+            if store is not None:
+                # Rendered to bytes; the store names the file by content
+                output_filename = None
+            if pool is not None:
+                jobs.append((report_type, context, pool.submit(f"{report_type}.html", context, output_filename, args.pdf_profile)))
+            elif store is not None:
+                with stage(f"{report_type}.write_pdf"):
+                    pdf = render_pdf_bytes(f"{report_type}.html", context, profile=args.pdf_profile)
+                store_report(store, project, report_type, context, pdf)
+            else:
+                with stage(f"{report_type}.write_pdf"):
+                    render_template(f"{report_type}.html", context, output_filename, profile=args.pdf_profile, formats=args.output)
+
+        if pool is not None:
+            for report_type, context, future in jobs:
+                try:
+                    result = future.result()
+                except RenderError as e:
+                    print(f"Failed to render {project} {report_type}: {e}")
+                    continue
+                if store is not None:
+                    store_report(store, project, report_type, context, result)
+                else:
+                    print(f"Report generated: {result} ({os.path.getsize(result) / 1024:.1f} KB, profile: {args.pdf_profile or 'default'})")
+    finally:
+        if pool is not None:
+            pool.close()
+        if store is not None:
+            store.close()
+        if profiler is not None:
+            profiler.close()
+        close_stores(stores)
+
+def store_report(store, project, report_type, context, pdf):
+    """Saves a rendered report with its charts and context in the artifact store."""
+    data = {k: v for k, v in context.items() if k != ASSETS_KEY}
+    latest = store.record(project, report_type, pdf, context.get(ASSETS_KEY), data)
+    print(f"Report generated: {latest} ({len(pdf) / 1024:.1f} KB, stored as {store.lookup(project, report_type)[:12]})")
 
 if __name__ == "__main__":
     main()
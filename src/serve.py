@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+from run import load_config, get_jira_client
+from clients.fake_jira import FakeJiraClient
+from clients.camera_probe import CameraProbe
+from reporting.render_pool import RenderPool
+from service.report_server import ReportService
+
+def main():
+    parser = argparse.ArgumentParser(description="SafetyMind on-demand report service")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--ttl", type=int, default=300, help="Seconds a generated PDF is served from cache")
+    parser.add_argument("--render-workers", type=int, default=0, help="Render PDFs in N isolated worker processes (0 = in-process)")
+    parser.add_argument("--probe-cameras", action="store_true", help="Check each camera's RTSP port and show its live status in final reports")
+    parser.add_argument("--camera-timeout", type=float, default=1.5, help="Seconds to wait for each camera's RTSP port with --probe-cameras")
+    parser.add_argument("--fake-jira", action="store_true", help="Serve synthetic issues instead of connecting to Jira")
+
+    args = parser.parse_args()
+
+    config = load_config()
+    jira = FakeJiraClient(projects=[p['jira_key'] for p in config['projects'].values()]) if args.fake_jira else get_jira_client()
+    pool = RenderPool(workers=args.render_workers) if args.render_workers else None
+
+    probe = CameraProbe(timeout=args.camera_timeout) if args.probe_cameras else None
+    service = ReportService(jira, config['projects'], pool, args.ttl, probe)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        if pool is not None:
+            pool.close()
+
+if __name__ == "__main__":
+    main()
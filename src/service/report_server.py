@@ -0,0 +1,126 @@
+import asyncio
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from reporting.report_context import ReportContext
+from reporting.renderer import render_pdf_bytes
+
+REPORT_TYPES = ('kickoff', 'progress', 'final', 'sprint')
+ROUTE = re.compile(r'^/reports/([A-Za-z0-9_-]+)/([a-z]+)/?$')
+CHUNK_SIZE = 64 * 1024
+
+async def respond(writer, status, body, content_type, extra_headers=None):
+    """Writes a complete HTTP/1.1 response."""
+    reasons = {200: "OK", 202: "Accepted", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+               405: "Method Not Allowed", 500: "Internal Server Error"}
+    headers = {"Content-Type": content_type, "Content-Length": str(len(body)), "Connection": "close"}
+    headers.update(extra_headers or {})
+    head = f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+    writer.write(head.encode('latin-1'))
+    # Stream the body in chunks so a slow client applies backpressure instead of buffering
+    view = memoryview(body)
+    for offset in range(0, len(view), CHUNK_SIZE):
+        writer.write(view[offset:offset + CHUNK_SIZE])
+        await writer.drain()
+    await writer.drain()
+
+class ReportService:
+    """Builds report PDFs on demand with single-flight coalescing and a TTL cache.
+
+    Concurrent requests for the same (project, type) share one in-flight
+    build; finished PDFs are served from memory until they expire.
+    """
+
+    def __init__(self, jira_client, projects_config, render_pool=None, ttl=300, camera_probe=None):
+        self.jira = jira_client
+        self.projects = projects_config
+        self.pool = render_pool
+        self.ttl = ttl
+        self.camera_probe = camera_probe
+        self._cache = {}
+        self._inflight = {}
+        # One worker: builds draw charts with pyplot, which isn't thread-safe
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-build")
+        self.stats = {"requests": 0, "builds": 0, "cache_hits": 0, "coalesced": 0}
+
+    def close(self):
+        self._executor.shutdown()
+
+    async def get_report(self, project, report_type):
+        key = (project, report_type)
+        self.stats["requests"] += 1
+
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.stats["cache_hits"] += 1
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._build(project, report_type))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one client disconnecting doesn't cancel the build for the others
+        return await asyncio.shield(task)
+
+    async def _build(self, project, report_type):
+        loop = asyncio.get_running_loop()
+        self.stats["builds"] += 1
+        builder = ReportContext(self.jira, self.projects[project], camera_probe=self.camera_probe)
+        context = await loop.run_in_executor(self._executor, builder.build, report_type)
+        if self.pool is not None:
+            pdf = await asyncio.wrap_future(self.pool.submit(f"{report_type}.html", context))
+        else:
+            pdf = await loop.run_in_executor(self._executor, partial(render_pdf_bytes, f"{report_type}.html", context))
+        self._cache[(project, report_type)] = (time.monotonic() + self.ttl, pdf)
+        return pdf
+
+    async def handle(self, reader, writer):
+        """Minimal HTTP/1.1 handler: GET /reports/{project}/{type} and GET /health."""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await respond(writer, 405, b"Method Not Allowed", "text/plain")
+                return
+            path = parts[1].split('?', 1)[0]
+
+            if path == '/health':
+                await respond(writer, 200, json.dumps(self.stats).encode(), "application/json")
+                return
+
+            match = ROUTE.match(path)
+            if not match or match.group(2) not in REPORT_TYPES:
+                await respond(writer, 404, b"Not Found", "text/plain")
+                return
+            project, report_type = match.groups()
+            if project not in self.projects:
+                await respond(writer, 404, f"Project {project} not found".encode(), "text/plain")
+                return
+
+            try:
+                pdf = await self.get_report(project, report_type)
+            except Exception as e:
+                print(f"Failed to build {project}/{report_type}: {e}")
+                await respond(writer, 500, f"Report build failed: {e}".encode(), "text/plain")
+                return
+            filename = f"{project}_{report_type}_{time.strftime('%Y%m%d')}.pdf"
+            await respond(writer, 200, pdf, "application/pdf",
+                                {"Content-Disposition": f'inline; filename="{filename}"'})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Report service listening on http://{host}:{port}/reports/<project>/<type>")
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from jira.resources import Issue
+from reporting.query_planner import QueryPlanner, REPORT_FIELDS, STORY_POINTS_FIELD, SPRINT_FIELD
+from reporting.report_context import ReportContext
+from reporting.renderer import render_template
+from service.report_server import respond
+from storage.summary_index import SummaryIndex
+
+# Issue fields each report type depends on; types missing here (final) never change with issue events
+WATCHED_FIELDS = {**REPORT_FIELDS, 'sprint': {'status', STORY_POINTS_FIELD, SPRINT_FIELD}}
+ISSUE_EVENTS = ('jira:issue_created', 'jira:issue_updated', 'jira:issue_deleted')
+
+def affected_types(event, report_types):
+    """Report types whose inputs a webhook event changes."""
+    candidates = [t for t in report_types if t in WATCHED_FIELDS]
+    items = (event.get('changelog') or {}).get('items')
+    if event.get('webhookEvent') != 'jira:issue_updated' or not items:
+        # Created and deleted issues change every issue-based view; so may an update without a changelog
+        return set(candidates)
+    changed = {item.get('fieldId') or item.get('field', '').lower() for item in items}
+    return {t for t in candidates if changed & WATCHED_FIELDS[t]}
+
+class WebhookWatcher:
+    """Keeps reports current from Jira issue webhooks instead of polling.
+
+    Each project is fetched once at startup. Afterwards, webhook events are
+    applied to the local copy of its issues, and the affected (project,
+    type) pairs are re-rendered once events for that project have been
+    quiet for `debounce` seconds (or after `max_delay` under constant edits).
+    """
+
+    def __init__(self, jira_client, projects_config, report_types, output_dir=".", debounce=10, max_delay=50,
+                 secret=None, context_options=None):
+        self.jira = jira_client
+        self.projects = {cfg['jira_key']: (name, cfg) for name, cfg in projects_config.items()}
+        self.report_types = report_types
+        self.output_dir = output_dir
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.secret = secret
+        self.context_options = context_options or {}
+        self.issues = {}      # jira key -> {issue key: issue}
+        self.summaries = {}   # jira key -> SummaryIndex, kept current by the same events
+        self._updated = {}    # issue key -> timestamp of the last applied event
+        self._pending = {}    # jira key -> set of report types to re-render
+        self._first_event = {}
+        self._timers = {}
+        # One worker: charts use pyplot, which isn't thread-safe, and renders are CPU bound anyway
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watch-render")
+        self.stats = {"events": 0, "applied": 0, "ignored": 0, "renders": 0, "failures": 0, "last_render": None}
+
+    def load(self):
+        """Fetches every watched project once with the fields the report types need."""
+        for jira_key in self.projects:
+            plan = QueryPlanner(jira_key).plan(self.report_types)
+            started = time.time()
+            issues = list(self.jira.iter_issues(plan.jql, fields=plan.fields)) if plan else []
+            self.issues[jira_key] = {i.key: i for i in issues}
+            self.summaries[jira_key] = SummaryIndex(jira_key)
+            if 'progress' in self.report_types:
+                # The scan already carries the index's fields
+                self.summaries[jira_key].reconcile(issues, started)
+            else:
+                self.summaries[jira_key].sync(self.jira)
+            print(f"Watching {jira_key}: {len(self.issues[jira_key])} issues loaded")
+
+    def apply(self, event):
+        """Applies one webhook event to the local issues. Returns the project key it touched, or None."""
+        raw = event.get('issue') or {}
+        key = raw.get('key')
+        if event.get('webhookEvent') not in ISSUE_EVENTS or not key:
+            return None
+        project = ((raw.get('fields') or {}).get('project') or {}).get('key') or key.rsplit('-', 1)[0]
+        if project not in self.issues:
+            return None
+        timestamp = event.get('timestamp', 0)
+        if timestamp and timestamp < self._updated.get(key, 0):
+            return None  # Jira doesn't guarantee delivery order; keep the newer state
+        self._updated[key] = timestamp
+        if event['webhookEvent'] == 'jira:issue_deleted':
+            self.issues[project].pop(key, None)
+            self.summaries[project].remove([key])
+        else:
+            issue = Issue({}, None, raw=raw)
+            self.issues[project][key] = issue
+            self.summaries[project].apply([issue])
+        return project
+
+    def handle_event(self, event):
+        self.stats["events"] += 1
+        project = self.apply(event)
+        types = affected_types(event, self.report_types) if project else set()
+        if not types:
+            self.stats["ignored"] += 1
+            return
+        self.stats["applied"] += 1
+        self._pending.setdefault(project, set()).update(types)
+        self._schedule(project)
+
+    def _schedule(self, project):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        first = self._first_event.setdefault(project, now)
+        timer = self._timers.get(project)
+        if timer is not None:
+            timer.cancel()
+        # Wait for a quiet period, but never longer than max_delay after the first pending event
+        delay = max(0.0, min(self.debounce, first + self.max_delay - now))
+        self._timers[project] = loop.call_later(delay, lambda: asyncio.ensure_future(self.flush(project)))
+
+    async def flush(self, project):
+        types = self._pending.pop(project, set())
+        self._first_event.pop(project, None)
+        self._timers.pop(project, None)
+        if not types:
+            return
+        issues = list(self.issues[project].values())
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.render, project, sorted(types), issues)
+
+    def render(self, jira_key, report_types, issues):
+        """Builds and renders report types for one project from local issues. Runs in the render thread."""
+        name, config = self.projects[jira_key]
+        builder = ReportContext(self.jira, config, summary_index=self.summaries.get(jira_key), **self.context_options)
+        builder.set_issues(issues, self.report_types)
+        for report_type in report_types:
+            output = os.path.join(self.output_dir, f"{name}_{report_type}_{datetime.now().strftime('%Y%m%d')}.pdf")
+            try:
+                render_template(f"{report_type}.html", builder.build(report_type), output)
+                self.stats["renders"] += 1
+                self.stats["last_render"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception as e:
+                self.stats["failures"] += 1
+                print(f"Failed to render {name} {report_type}: {e}")
+
+    async def render_all(self):
+        loop = asyncio.get_running_loop()
+        for jira_key, issues in self.issues.items():
+            await loop.run_in_executor(self._executor, self.render, jira_key, self.report_types, list(issues.values()))
+
+    async def handle(self, reader, writer):
+        """Minimal HTTP/1.1 handler: POST /webhook[?secret=...] and GET /health."""
+        try:
+            request_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value.strip())
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                await respond(writer, 400, b"Bad Request", "text/plain")
+                return
+            method, target = parts[0], parts[1]
+            path, _, query = target.partition('?')
+
+            if method == 'GET' and path == '/health':
+                body = {**self.stats, "pending": {p: sorted(t) for p, t in self._pending.items()}}
+                await respond(writer, 200, json.dumps(body).encode(), "application/json")
+                return
+            if method != 'POST' or path.rstrip('/') != '/webhook':
+                await respond(writer, 404, b"Not Found", "text/plain")
+                return
+            if self.secret and f"secret={self.secret}" not in query.split('&'):
+                await respond(writer, 403, b"Forbidden", "text/plain")
+                return
+            try:
+                event = json.loads(await reader.readexactly(length))
+            except (ValueError, asyncio.IncompleteReadError):
+                await respond(writer, 400, b"Invalid JSON payload", "text/plain")
+                return
+            self.handle_event(event)
+            await respond(writer, 202, b"Accepted", "text/plain")
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8090, render_on_start=True):
+        await asyncio.get_running_loop().run_in_executor(None, self.load)
+        if render_on_start:
+            await self.render_all()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Webhook receiver listening on http://{host}:{port}/webhook")
+        async with server:
+            await server.serve_forever()
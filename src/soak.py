@@ -0,0 +1,39 @@
+import argparse
+import sys
+from datetime import datetime
+from run import load_config
+from clients.fake_jira import FakeJiraClient
+from diagnostics.soak import SoakRun
+
+def main():
+    parser = argparse.ArgumentParser(description="SafetyMind soak test: builds and renders reports repeatedly against synthetic Jira data and fails on memory growth")
+    parser.add_argument("--project", nargs='+', help="Project(s) to cycle through (default: all in config/projects.yaml)")
+    parser.add_argument("--type", nargs='+', default=['kickoff', 'progress'], choices=['kickoff', 'progress', 'final', 'sprint'], help="Report types built each iteration")
+    parser.add_argument("--iterations", type=int, default=1000, help="Iterations to run")
+    parser.add_argument("--warmup", type=int, default=50, help="Iterations excluded from the growth fit (caches filling up)")
+    parser.add_argument("--sample-every", type=int, default=10, help="Iterations between samples")
+    parser.add_argument("--threshold-kb", type=float, default=8.0, help="Largest RSS / traced memory growth per iteration that still passes")
+    parser.add_argument("--issues", type=int, default=200, help="Synthetic issues per project")
+    parser.add_argument("--no-render", action="store_true", help="Only build contexts, skip the PDF layout")
+    parser.add_argument("--no-trace", action="store_true", help="Skip tracemalloc (faster, RSS only)")
+    parser.add_argument("--output-dir", help="Where samples.csv and growth.txt go (default: soak_<date>/)")
+
+    args = parser.parse_args()
+
+    config = load_config()['projects']
+    if args.project:
+        missing = [p for p in args.project if p not in config]
+        if missing:
+            print(f"Project {', '.join(missing)} not found in config/projects.yaml")
+            return 2
+        config = {p: config[p] for p in args.project}
+
+    # One client for the whole run, like a daemon would keep, so its caches are part of what is measured
+    jira = FakeJiraClient(issues_per_project=args.issues, projects=[p['jira_key'] for p in config.values()])
+    soak = SoakRun(jira, config, args.type, args.output_dir or f"soak_{datetime.now().strftime('%Y%m%d_%H%M')}",
+                   iterations=args.iterations, warmup=args.warmup, sample_every=args.sample_every,
+                   threshold_kb=args.threshold_kb, render=not args.no_render, trace=not args.no_trace)
+    return 0 if soak.run()["passed"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS editions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_editions_report ON editions (project, report_type, id);
+CREATE TABLE IF NOT EXISTS edition_artifacts (
+    edition INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (edition, name)
+);
+CREATE INDEX IF NOT EXISTS idx_edition_artifacts_hash ON edition_artifacts (hash);
+"""
+
+class ArtifactStore:
+    """Content-addressed store for generated PDFs, charts and report contexts.
+
+    Blobs live under objects/<hash[:2]>/<hash>, written to a temp file and
+    renamed into place, so identical outputs share one file and concurrent
+    writers never leave a torn one. A SQLite index maps each edition (one
+    per record() call, so several runs on one day are all kept) and artifact
+    name to a hash, and latest/ holds stable pointers to the newest edition.
+
+    Writing objects with their index rows and garbage collection both run
+    under the database write lock (BEGIN IMMEDIATE), so an object cannot be
+    collected between being found on disk and being referenced.
+    """
+
+    def __init__(self, base_dir="data/artifacts", keep=30):
+        self.base_dir = base_dir
+        self.keep = keep
+        self.objects_dir = os.path.join(base_dir, "objects")
+        self.latest_dir = os.path.join(base_dir, "latest")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.latest_dir, exist_ok=True)
+        # Autocommit mode; writes go through _transaction()
+        self.conn = sqlite3.connect(os.path.join(base_dir, "index.sqlite"), timeout=30, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put(self, data):
+        """Stores bytes and returns their sha256. Existing content is not rewritten. Call inside _transaction()."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            return f.read()
+
+    def record(self, project, report_type, pdf, assets=None, context=None, run_date=None):
+        """Stores one report edition (PDF, chart assets and context JSON) and indexes it.
+
+        Returns the path of the stable "latest" pointer for the PDF.
+        """
+        run_date = (run_date or date.today()).isoformat()
+        entries = [(f"{report_type}.pdf", pdf)]
+        for name, (data, _mime) in (assets.items() if assets is not None else ()):
+            entries.append((f"charts/{name}", data))
+        if context is not None:
+            entries.append(("context.json", json.dumps(context, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')))
+
+        with self._transaction():
+            edition = self.conn.execute("INSERT INTO editions (project, report_type, run_date, created_at) VALUES (?, ?, ?, ?)",
+                                        (project, report_type, run_date, time.time())).lastrowid
+            rows = [(edition, name, self._put(data), len(data)) for name, data in entries]
+            self.conn.executemany("INSERT INTO edition_artifacts VALUES (?, ?, ?, ?)", rows)
+            latest = self._link_latest(f"{project}_{report_type}.pdf", rows[0][2])
+        self.prune(project, report_type)
+        return latest
+
+    def _link_latest(self, name, digest):
+        """Points latest/<name> at an object: hard link when possible, copy otherwise, swapped in atomically."""
+        target = os.path.join(self.latest_dir, name)
+        tmp_path = f"{target}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        try:
+            os.link(self.object_path(digest), tmp_path)
+        except OSError:
+            shutil.copyfile(self.object_path(digest), tmp_path)
+        os.replace(tmp_path, target)
+        return target
+
+    def editions(self, project, report_type):
+        """(edition id, run date) of every edition stored for (project, type), newest first."""
+        return self.conn.execute("SELECT id, run_date FROM editions WHERE project = ? AND report_type = ? ORDER BY id DESC",
+                                 (project, report_type)).fetchall()
+
+    def lookup(self, project, report_type, edition=None, name=None):
+        """Hash of an artifact from the given edition id (default: latest), or None."""
+        if edition is None:
+            edition = next((e for e, _ in self.editions(project, report_type)), None)
+        row = self.conn.execute(
+            "SELECT a.hash FROM edition_artifacts a JOIN editions e ON e.id = a.edition "
+            "WHERE e.project = ? AND e.report_type = ? AND e.id = ? AND a.name = ?",
+            (project, report_type, edition, name or f"{report_type}.pdf")).fetchone()
+        return row[0] if row else None
+
+    def prune(self, project, report_type):
+        """Drops editions beyond `keep` for (project, type), then collects unreferenced objects. Returns objects removed."""
+        expired = [e for e, _ in self.editions(project, report_type)[self.keep:]]
+        if not expired:
+            return 0
+        marks = ','.join('?' * len(expired))
+        with self._transaction():
+            self.conn.execute(f"DELETE FROM edition_artifacts WHERE edition IN ({marks})", expired)
+            self.conn.execute(f"DELETE FROM editions WHERE id IN ({marks})", expired)
+            return self._collect_garbage()
+
+    def collect_garbage(self):
+        """Deletes every object no edition references, and temp files left by interrupted writes."""
+        with self._transaction():
+            return self._collect_garbage()
+
+    def _collect_garbage(self):
+        referenced = {r[0] for r in self.conn.execute("SELECT DISTINCT hash FROM edition_artifacts")}
+        removed = 0
+        for directory, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name in referenced:
+                    continue
+                try:
+                    os.remove(os.path.join(directory, name))
+                    removed += 0 if name.endswith(".tmp") else 1
+                except FileNotFoundError:
+                    pass
+        return removed
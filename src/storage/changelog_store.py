@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from reporting.query_planner import updated_since
+
+# Defaults when no JiraMetadata is available to list the statuses of each category
+DONE_STATUSES = ['Done', 'Completado', 'Cerrado']
+TODO_STATUSES = ['To Do', 'Por hacer', 'Backlog', 'Open', 'Abierto']
+JIRA_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    key TEXT NOT NULL,
+    at INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    from_status TEXT,
+    to_status TEXT NOT NULL,
+    PRIMARY KEY (key, at, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    last_sync INTEGER NOT NULL
+);
+"""
+
+def _epoch(ts):
+    return int(datetime.strptime(ts, JIRA_TS_FORMAT).timestamp())
+
+class ChangelogStore:
+    """Incrementally ingests Jira status histories and derives flow metrics from them.
+
+    Only issues updated since the previous sync are fetched with their
+    changelog; their stored transitions are replaced wholesale, everything
+    else is read from the local SQLite file.
+    """
+
+    def __init__(self, project_key, base_dir="data/changelog", done_statuses=None, todo_statuses=None):
+        self.project_key = project_key
+        self.done_statuses = list(done_statuses or DONE_STATUSES)
+        self.todo_statuses = list(todo_statuses or TODO_STATUSES)
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{project_key}.sqlite")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def last_sync(self):
+        row = self.conn.execute("SELECT last_sync FROM sync_state WHERE project = ?", (self.project_key,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, jira_client):
+        """Pulls changelogs for issues updated since the last sync. Returns the number of issues ingested."""
+        last, started = jira_client.sync_state(f"changelog/{self.project_key}", [self.last_sync(), int(time.time())])
+        jql = f'project = "{self.project_key}"'
+        if last is not None:
+            jql += f' AND {updated_since(last, started)}'
+
+        count = 0
+        with self.conn:
+            for issue in jira_client.iter_issues(jql, fields="created,status", expand="changelog"):
+                self.conn.execute("DELETE FROM transitions WHERE key = ?", (issue.key,))
+                changes = self._status_changes(jira_client, issue)
+                self.conn.executemany("INSERT OR REPLACE INTO transitions VALUES (?, ?, ?, ?, ?)", self._transitions(issue, changes))
+                count += 1
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (self.project_key, started))
+        print(f"Changelog sync for {self.project_key}: {count} issues updated")
+        return count
+
+    def _status_changes(self, jira_client, issue):
+        """(created, from, to) for every status change of an issue, oldest first.
+
+        Search with expand=changelog returns only the first ~100 histories;
+        when it says there are more, the full changelog is paged instead.
+        """
+        changelog = issue.changelog
+        if len(changelog.histories) < (getattr(changelog, 'total', None) or 0):
+            items = [(h['created'], i.get('field'), i.get('fromString'), i.get('toString'))
+                     for h in jira_client.issue_changelog(issue.key) for i in h.get('items', [])]
+        else:
+            items = [(h.created, i.field, i.fromString, i.toString) for h in changelog.histories for i in h.items]
+        return sorted(((created, old, new) for created, field, old, new in items if field == 'status'), key=lambda c: c[0])
+
+    def _transitions(self, issue, status_changes):
+        rows = []
+        # Creation counts as entering the initial status
+        initial = status_changes[0][1] if status_changes else issue.fields.status.name
+        rows.append((issue.key, _epoch(issue.fields.created), 0, None, initial))
+        for seq, (created, old, new) in enumerate(status_changes, start=1):
+            rows.append((issue.key, _epoch(created), seq, old, new))
+        return rows
+
+    def load_frame(self):
+        return pd.read_sql_query("SELECT key, at, seq, to_status FROM transitions ORDER BY key, at, seq", self.conn)
+
+    def time_in_status(self, now=None, frame=None):
+        """Total and percentile days spent in each status, across all issues."""
+        df = self.load_frame() if frame is None else frame
+        if df.empty:
+            return pd.DataFrame(columns=["issues", "mean_days", "p50_days", "p85_days", "p95_days"])
+        now = now or int(time.time())
+        at = df['at'].to_numpy()
+        same_key = df['key'].to_numpy()[1:] == df['key'].to_numpy()[:-1]
+        # The next transition of the same issue closes the interval; the last one stays open until now
+        leave = np.append(np.where(same_key, at[1:], now), now)
+        days = df.assign(days=(leave - at) / 86400.0)
+        days = days[~days['to_status'].isin(self.done_statuses)]
+        per_issue = days.groupby(['to_status', 'key'])['days'].sum().groupby(level=0)
+        return pd.DataFrame({
+            "issues": per_issue.size(),
+            "mean_days": per_issue.mean(),
+            "p50_days": per_issue.quantile(0.5),
+            "p85_days": per_issue.quantile(0.85),
+            "p95_days": per_issue.quantile(0.95),
+        }).round(1)
+
+    def cycle_and_lead_times(self, frame=None):
+        """Per-issue lead time (created -> done) and cycle time (work started -> done) in days."""
+        df = self.load_frame() if frame is None else frame
+        grouped_at = df.groupby('key')['at']
+        created = grouped_at.min()
+        started = df[~df['to_status'].isin(self.todo_statuses + self.done_statuses)].groupby('key')['at'].min()
+        # An issue re-opened after done only counts its last completion
+        done = df[df['to_status'].isin(self.done_statuses)].groupby('key')['at'].max()
+        last_status = df.groupby('key')['to_status'].last()
+        done = done[last_status.reindex(done.index).isin(self.done_statuses)]
+        out = pd.DataFrame({
+            "lead_days": (done - created.reindex(done.index)) / 86400.0,
+            "cycle_days": (done - started.reindex(done.index)) / 86400.0,
+        })
+        return out
+
+    def flow_summary(self, percentiles=(0.5, 0.85, 0.95)):
+        """Percentiles of lead and cycle time for completed issues, ready for the template."""
+        times = self.cycle_and_lead_times()
+        summary = {"completed": int(len(times))}
+        for column in ("lead_days", "cycle_days"):
+            values = times[column].dropna()
+            for p in percentiles:
+                summary[f"{column}_p{int(p * 100)}"] = round(float(values.quantile(p)), 1) if not values.empty else None
+        return summary
@@ -0,0 +1,86 @@
+import glob
+import gzip
+import json
+import os
+from datetime import date
+from clients.jira_metadata import is_done, is_overdue
+
+def issue_rows(issues):
+    """Compact per-issue state kept for each report edition: key -> [summary, status, due, done]."""
+    return {
+        i.key: [i.fields.summary, i.fields.status.name, getattr(i.fields, 'duedate', None), is_done(i.fields.status)]
+        for i in issues
+    }
+
+def _overdue(row, on_date):
+    return not row[3] and is_overdue(row[2], date.fromisoformat(on_date))
+
+class ReportHistory:
+    """Keeps a compact snapshot of each report edition and diffs the current one against the previous.
+
+    Editions are stored per (project, report type) as gzipped JSON named by
+    date. The diff joins both editions on issue key through dict lookups, so
+    it stays linear in the number of issues.
+    """
+
+    def __init__(self, base_dir="data/report_history", keep=12):
+        self.base_dir = base_dir
+        self.keep = keep
+
+    def _dir(self, project_key, report_type):
+        path = os.path.join(self.base_dir, project_key, report_type)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def previous(self, project_key, report_type, before=None):
+        """Latest edition strictly before `before` (default today), as (date_str, rows), or (None, {})."""
+        before = (before or date.today()).isoformat()
+        editions = sorted(glob.glob(os.path.join(self._dir(project_key, report_type), "*.json.gz")))
+        for path in reversed(editions):
+            edition_date = os.path.basename(path)[:10]
+            if edition_date < before:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    return edition_date, json.load(f)
+        return None, {}
+
+    def save(self, project_key, report_type, rows, on_date=None):
+        directory = self._dir(project_key, report_type)
+        path = os.path.join(directory, f"{(on_date or date.today()).isoformat()}.json.gz")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        # Retention: drop the oldest editions beyond `keep`
+        editions = sorted(glob.glob(os.path.join(directory, "*.json.gz")))
+        for old in editions[:-self.keep]:
+            os.remove(old)
+
+    def record_and_diff(self, project_key, report_type, rows, on_date=None):
+        """Diffs rows against the previous edition, stores rows as today's edition and returns the diff."""
+        on_date = on_date or date.today()
+        since, previous = self.previous(project_key, report_type, on_date)
+        changes = diff_editions(previous, rows, on_date.isoformat(), since)
+        self.save(project_key, report_type, rows, on_date)
+        return changes
+
+def diff_editions(previous, current, today, since=None):
+    """Changes between two editions: new and removed issues, status transitions, due-date slips and newly overdue items."""
+    changes = {"since": since, "new": [], "transitions": [], "slips": [], "overdue": [], "removed": []}
+    if since is None:
+        # First edition: nothing to compare against
+        return changes
+
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            changes["new"].append({"key": key, "summary": row[0], "status": row[1]})
+            continue
+        if old[1] != row[1]:
+            changes["transitions"].append({"key": key, "summary": row[0], "from": old[1], "to": row[1]})
+        if old[2] and row[2] and row[2] > old[2]:
+            changes["slips"].append({"key": key, "summary": row[0], "from": old[2], "to": row[2]})
+        if _overdue(row, today) and not _overdue(old, since):
+            changes["overdue"].append({"key": key, "summary": row[0], "due": row[2]})
+
+    changes["removed"] = [{"key": k, "summary": previous[k][0]} for k in sorted(previous.keys() - current.keys())]
+    return changes
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from clients.jira_metadata import is_done
+
+OPEN_END = 9999999  # valid_to of the current version of an issue
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue_versions (
+    key TEXT NOT NULL,
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER NOT NULL,
+    status TEXT,
+    done INTEGER NOT NULL,
+    points REAL NOT NULL,
+    created INTEGER,
+    resolved INTEGER,
+    due INTEGER,
+    PRIMARY KEY (key, valid_from)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_versions_open ON issue_versions (valid_to);
+"""
+
+def _ordinal(value):
+    """Converts a Jira date/datetime string (or date) to a day ordinal, None if empty."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value[:10], "%Y-%m-%d").toordinal()
+
+def snapshot_rows(issues, points_field='customfield_10016'):
+    """Maps Jira issues to the flat rows stored in a snapshot."""
+    rows = []
+    for i in issues:
+        f = i.fields
+        done = is_done(f.status)
+        rows.append({
+            "key": i.key,
+            "status": f.status.name,
+            "done": int(done),
+            "points": float(getattr(f, points_field, None) or 0),
+            "created": _ordinal(getattr(f, 'created', None)),
+            "resolved": _ordinal(getattr(f, 'resolutiondate', None)),
+            "due": _ordinal(getattr(f, 'duedate', None)),
+        })
+    return rows
+
+class SnapshotStore:
+    """Daily per-project snapshots of issue state, stored as validity intervals in SQLite.
+
+    An issue only gets a new row when its state changes, so a year of daily
+    snapshots costs roughly one row per change rather than one per issue per
+    day. The state on any day is the set of rows whose interval contains it.
+    """
+
+    def __init__(self, project_key, base_dir="data/snapshots"):
+        self.project_key = project_key
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{project_key}.sqlite")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, rows, snapshot_date=None):
+        """Records the state of every issue on snapshot_date (default: today)."""
+        day = (snapshot_date or date.today()).toordinal()
+        current = {
+            r[0]: r[1:] for r in self.conn.execute(
+                "SELECT key, status, done, points, created, resolved, due, valid_from "
+                "FROM issue_versions WHERE valid_to = ?", (OPEN_END,))
+        }
+        inserts, closes = [], []
+        for row in rows:
+            values = (row['status'], row['done'], row['points'], row['created'], row['resolved'], row['due'])
+            previous = current.pop(row['key'], None)
+            if previous is not None:
+                if previous[:6] == values:
+                    continue
+                if previous[6] >= day:
+                    # Same-day re-run: overwrite instead of creating an empty interval
+                    self.conn.execute("DELETE FROM issue_versions WHERE key = ? AND valid_from = ?", (row['key'], previous[6]))
+                else:
+                    closes.append((day, row['key'], previous[6]))
+            inserts.append((row['key'], day, OPEN_END) + values)
+
+        # Issues that disappeared from Jira stop counting from this day on; a version opened today is dropped instead
+        closes.extend((day, key, prev[6]) for key, prev in current.items() if prev[6] < day)
+        drops = [(key, prev[6]) for key, prev in current.items() if prev[6] >= day]
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM issue_versions WHERE key = ? AND valid_from = ?", drops)
+            self.conn.executemany("UPDATE issue_versions SET valid_to = ? WHERE key = ? AND valid_from = ?", closes)
+            self.conn.executemany("INSERT OR REPLACE INTO issue_versions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", inserts)
+        return len(inserts)
+
+    def load_frame(self, columns="*"):
+        """Returns the stored intervals as a DataFrame."""
+        return pd.read_sql_query(f"SELECT {columns} FROM issue_versions", self.conn)
+
+    def daily_series(self, start, end, frame=None):
+        """Scope, done and remaining (count and points) for every day in [start, end].
+
+        Each interval adds its value on valid_from and removes it on valid_to;
+        a cumulative sum over the day axis then yields every daily total at once.
+        """
+        df = self.load_frame("valid_from, valid_to, done, points") if frame is None else frame
+        d0, d1 = start.toordinal(), end.toordinal()
+        n = d1 - d0 + 1
+        # Typed explicitly: columns of an empty result come back as object arrays, which np.add.at won't index with
+        lo = np.clip(df['valid_from'].to_numpy(dtype=np.int64), d0, d1 + 1) - d0
+        hi = np.clip(df['valid_to'].to_numpy(dtype=np.int64), d0, d1 + 1) - d0
+        done = df['done'].to_numpy(dtype=bool)
+        points = df['points'].to_numpy(dtype=float)
+
+        def accumulate(weights):
+            delta = np.zeros(n + 2)
+            np.add.at(delta, lo, weights)
+            np.add.at(delta, hi, -weights)
+            return np.cumsum(delta)[:n]
+
+        ones = np.ones(len(df))
+        series = pd.DataFrame({
+            "scope_count": accumulate(ones),
+            "done_count": accumulate(ones * done),
+            "scope_points": accumulate(points),
+            "done_points": accumulate(points * done),
+        }, index=pd.date_range(start, end, freq='D'))
+        series["remaining_count"] = series["scope_count"] - series["done_count"]
+        series["remaining_points"] = series["scope_points"] - series["done_points"]
+        return series
+
+    def burndown(self, start, end):
+        return self.daily_series(start, end)[["remaining_count", "remaining_points"]]
+
+    def burnup(self, start, end):
+        return self.daily_series(start, end)[["scope_count", "done_count", "scope_points", "done_points"]]
+
+    def throughput(self, start, end, freq='W'):
+        """Issues resolved and points delivered per period, from the latest version of each issue."""
+        df = pd.read_sql_query(
+            "SELECT key, points, resolved FROM issue_versions WHERE valid_to = ? AND done = 1 AND resolved IS NOT NULL",
+            self.conn, params=(OPEN_END,))
+        latest = df[(df['resolved'] >= start.toordinal()) & (df['resolved'] <= end.toordinal())]
+        resolved = pd.to_datetime(latest['resolved'].astype('int64').map(date.fromordinal))
+        grouped = latest.assign(resolved=resolved).set_index('resolved').resample(freq)
+        return pd.DataFrame({"issues": grouped['key'].count(), "points": grouped['points'].sum()})
+
+    def velocity(self, start, end, freq='W', window=3):
+        """Rolling mean of delivered points per period."""
+        tp = self.throughput(start, end, freq)
+        return tp['points'].rolling(window, min_periods=1).mean()
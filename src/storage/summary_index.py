@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import threading
+import time
+from clients.jira_metadata import is_done, status_category, overdue_before
+from reporting.query_planner import updated_since
+
+CRITICAL_PRIORITIES = ['High', 'Highest', 'Critical']
+DIMENSIONS = ('category', 'status', 'priority', 'assignee')
+INDEX_FIELDS = "summary,status,priority,assignee,duedate,updated"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    summary TEXT,
+    category TEXT NOT NULL,
+    status TEXT,
+    priority TEXT,
+    assignee TEXT,
+    done INTEGER NOT NULL,
+    due TEXT,
+    updated TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_issues_open_due ON issues (done, due);
+CREATE INDEX IF NOT EXISTS idx_issues_open_priority ON issues (done, priority);
+CREATE INDEX IF NOT EXISTS idx_issues_done_updated ON issues (done, updated);
+CREATE TABLE IF NOT EXISTS counts (
+    dim TEXT NOT NULL,
+    value TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (dim, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    last_sync INTEGER NOT NULL,
+    last_full INTEGER NOT NULL
+);
+"""
+
+def _row(issue):
+    f = issue.fields
+    done = is_done(f.status)
+    return {
+        "key": issue.key,
+        "summary": f.summary,
+        "category": status_category(f.status) or ('done' if done else 'unknown'),
+        "status": f.status.name,
+        "priority": getattr(getattr(f, 'priority', None), 'name', None) or 'Medium',
+        "assignee": getattr(getattr(f, 'assignee', None), 'displayName', None) or 'Sin asignar',
+        "done": int(done),
+        "due": getattr(f, 'duedate', None),
+        "updated": getattr(f, 'updated', None),
+    }
+
+class SummaryIndex:
+    """Per-project counts and ordered issue sets, maintained by deltas in SQLite.
+
+    Counts by status category, status, priority and assignee are adjusted
+    only for issues that changed, and the open/overdue/recently closed sets
+    are read through indexes on (done, due), (done, priority) and
+    (done, updated). Building the summary of a progress report therefore
+    costs O(changed issues) plus the rows actually shown.
+    """
+
+    def __init__(self, project_key, base_dir="data/summary", reconcile_days=7):
+        self.project_key = project_key
+        self.reconcile_days = reconcile_days
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{project_key}.sqlite")
+        # Written by the watcher's event loop while its render thread reads; the lock serializes access to the connection
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def _bump(self, rows, sign):
+        self.conn.executemany(
+            "INSERT INTO counts VALUES (?, ?, ?) ON CONFLICT (dim, value) DO UPDATE SET n = n + excluded.n",
+            [(dim, row[dim], sign) for row in rows for dim in DIMENSIONS])
+
+    def apply(self, issues):
+        """Applies changed issues: their old contribution to the counts is removed and the new one added."""
+        rows = [_row(i) for i in issues]
+        if not rows:
+            return 0
+        with self._lock, self.conn:
+            self._remove([r["key"] for r in rows])
+            self._bump(rows, 1)
+            self.conn.executemany(
+                "INSERT INTO issues VALUES (:key, :summary, :category, :status, :priority, :assignee, :done, :due, :updated)", rows)
+        return len(rows)
+
+    def remove(self, keys):
+        with self._lock, self.conn:
+            return self._remove(keys)
+
+    def _remove(self, keys):
+        old = []
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cursor = self.conn.execute(
+                f"SELECT category, status, priority, assignee FROM issues WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            old.extend(dict(zip(DIMENSIONS, r)) for r in cursor)
+            self.conn.execute(f"DELETE FROM issues WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+        self._bump(old, -1)
+        return len(old)
+
+    def sync(self, jira_client):
+        """Applies issues updated since the last sync. Returns the number applied.
+
+        Deletions don't show up in an `updated >=` query, so every
+        reconcile_days (and on the first run) the whole project is scanned
+        and keys that disappeared are removed.
+        """
+        with self._lock:
+            state = self.conn.execute("SELECT last_sync, last_full FROM sync_state WHERE project = ?", (self.project_key,)).fetchone()
+        state, started = jira_client.sync_state(f"summary/{self.project_key}", [state and list(state), int(time.time())])
+        full = state is None or started - state[1] > self.reconcile_days * 86400
+        jql = f'project = "{self.project_key}"'
+        if not full:
+            jql += f' AND {updated_since(state[0], started)}'
+
+        batch, seen, count = [], set(), 0
+        for issue in jira_client.iter_issues(jql, fields=INDEX_FIELDS):
+            batch.append(issue)
+            seen.add(issue.key)
+            if len(batch) >= 500:
+                count += self.apply(batch)
+                batch = []
+        count += self.apply(batch)
+        self._finish_sync(started, seen if full else None, state[1] if state else started)
+        print(f"Summary index for {self.project_key}: {count} issues applied{' (full reconcile)' if full else ''}")
+        return count
+
+    def reconcile(self, issues, fetched_at):
+        """Full sync from a scan of the whole project fetched elsewhere (e.g. a report's prefetch), without querying Jira.
+
+        Only issues whose `updated` differs from the stored one are applied,
+        and keys missing from the scan are removed. The issues must carry
+        INDEX_FIELDS; fetched_at is when the scan started, so the next
+        incremental sync picks up from there.
+        """
+        issues = list(issues)
+        with self._lock:
+            stored = dict(self.conn.execute("SELECT key, updated FROM issues"))
+        changed = [i for i in issues if i.key not in stored or stored[i.key] != getattr(i.fields, 'updated', None)]
+        count = sum(self.apply(changed[start:start + 500]) for start in range(0, len(changed), 500))
+        self._finish_sync(int(fetched_at), {i.key for i in issues}, None)
+        print(f"Summary index for {self.project_key}: {count} of {len(issues)} issues changed (full reconcile)")
+        return count
+
+    def _finish_sync(self, started, seen, last_full):
+        """Records the sync; after a full scan (seen = every key found) also removes keys that disappeared."""
+        with self._lock, self.conn:
+            if seen is not None:
+                stale = [k for (k,) in self.conn.execute("SELECT key FROM issues") if k not in seen]
+                self._remove(stale)
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                              (self.project_key, started, started if seen is not None else last_full))
+
+    def counts(self):
+        """{dimension: {value: count}} over every indexed issue."""
+        out = {dim: {} for dim in DIMENSIONS}
+        with self._lock:
+            rows = self.conn.execute("SELECT dim, value, n FROM counts WHERE n > 0 ORDER BY dim, n DESC").fetchall()
+        for dim, value, n in rows:
+            out[dim][value] = n
+        return out
+
+    def totals(self):
+        categories = self.counts()['category']
+        total = sum(categories.values())
+        done = categories.get('done', 0)
+        return {"total": total, "done": done, "percentage": int(done / total * 100) if total else 0}
+
+    def overdue(self, today=None, limit=None):
+        """Open issues past their due date, most overdue first."""
+        sql = "SELECT key, summary, priority, due FROM issues WHERE done = 0 AND due IS NOT NULL AND due < ? ORDER BY due"
+        return self._dicts(sql, (overdue_before(today),), limit)
+
+    def _high_priority_sql(self, columns):
+        # High priority open issues that aren't overdue (those already come from overdue())
+        return (f"SELECT {columns} FROM issues WHERE done = 0 AND (due IS NULL OR due >= ?) "
+                f"AND priority IN ({','.join('?' * len(CRITICAL_PRIORITIES))})")
+
+    def critical(self, today=None, limit=None):
+        """Open issues that are overdue or high priority, with the reason; overdue ones first, by due date."""
+        items = []
+        for row in self.overdue(today, limit):
+            reason = f"Prioridad: {row['priority']}" if row['priority'] in CRITICAL_PRIORITIES else ""
+            items.append({"key": row['key'], "summary": row['summary'], "reason": f"{reason} | Vencida: {row['due']}"})
+        remaining = None if limit is None else limit - len(items)
+        if remaining is None or remaining > 0:
+            params = (overdue_before(today), *CRITICAL_PRIORITIES)
+            for row in self._dicts(self._high_priority_sql("key, summary, priority"), params, remaining):
+                items.append({"key": row['key'], "summary": row['summary'], "reason": f"Prioridad: {row['priority']}"})
+        return items
+
+    def critical_count(self, today=None):
+        today = overdue_before(today)
+        with self._lock:
+            overdue = self.conn.execute("SELECT COUNT(*) FROM issues WHERE done = 0 AND due IS NOT NULL AND due < ?", (today,)).fetchone()[0]
+            high = self.conn.execute(self._high_priority_sql("COUNT(*)"), (today, *CRITICAL_PRIORITIES)).fetchone()[0]
+        return overdue + high
+
+    def issue_rows(self):
+        """Every indexed issue as report_diff.issue_rows builds it: key -> [summary, status, due, done]."""
+        with self._lock:
+            rows = self.conn.execute("SELECT key, summary, status, due, done FROM issues ORDER BY key").fetchall()
+        return {key: [summary, status, due, bool(done)] for key, summary, status, due, done in rows}
+
+    def recently_closed(self, limit=10):
+        return self._dicts("SELECT key, summary, updated FROM issues WHERE done = 1 ORDER BY updated DESC", (), limit)
+
+    def upcoming(self, limit=None):
+        """Open issues by due date, undated ones last."""
+        rows = self._dicts("SELECT key, summary, priority, due FROM issues WHERE done = 0 AND due IS NOT NULL ORDER BY due", (), limit)
+        if limit is None or len(rows) < limit:
+            rows += self._dicts("SELECT key, summary, priority, due FROM issues WHERE done = 0 AND due IS NULL", (),
+                                None if limit is None else limit - len(rows))
+        return rows
+
+    def _dicts(self, sql, params, limit=None):
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, r)) for r in cursor]
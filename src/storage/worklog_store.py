@@ -0,0 +1,118 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+JIRA_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+NO_EPIC = "Sin épica"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS worklogs (
+    id INTEGER PRIMARY KEY,
+    issue_id TEXT NOT NULL,
+    author TEXT,
+    started INTEGER NOT NULL,
+    seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_worklogs_issue ON worklogs (issue_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    site TEXT PRIMARY KEY,
+    since INTEGER NOT NULL
+);
+"""
+
+def _epoch(ts):
+    return int(datetime.strptime(ts, JIRA_TS_FORMAT).timestamp())
+
+def _hours(seconds):
+    return round(float(seconds) / 3600, 1)
+
+class WorklogStore:
+    """Site-wide copy of Jira worklogs, kept current with the bulk worklog endpoints.
+
+    Each sync asks worklog/updated and worklog/deleted for the IDs changed
+    since the previous `until` and fetches the changed records through
+    worklog/list in batches of 1000, so a run costs a few requests however
+    many issues carry worklogs. Aggregations read the local SQLite file.
+    """
+
+    def __init__(self, server=None, base_dir="data/worklogs"):
+        self.site = hashlib.sha1((server or 'default').encode()).hexdigest()[:12]
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = os.path.join(base_dir, f"{self.site}.sqlite")
+        # Shared by the pipeline's fetch threads; the lock serializes access to the connection
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def since(self):
+        row = self.conn.execute("SELECT since FROM sync_state WHERE site = ?", (self.site,)).fetchone()
+        return row[0] if row else 0
+
+    def sync(self, jira_client):
+        """Applies worklogs changed or deleted since the last sync. Returns the number of worklogs stored."""
+        started = time.perf_counter()
+        since = jira_client.sync_state(f"worklogs/{self.site}", self.since())
+        ids, until = jira_client.updated_worklog_ids(since)
+        rows = [(int(w['id']), str(w['issueId']), (w.get('author') or {}).get('displayName'), _epoch(w['started']),
+                 int(w.get('timeSpentSeconds') or 0)) for w in jira_client.worklogs(ids)]
+        # On the first sync there is nothing local to delete
+        deleted = jira_client.deleted_worklog_ids(since)[0] if since else []
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO worklogs VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.executemany("DELETE FROM worklogs WHERE id = ?", [(int(i),) for i in deleted])
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (self.site, until))
+        print(f"Worklog sync: {len(rows)} updated, {len(deleted)} deleted in {time.perf_counter() - started:.2f}s")
+        return len(rows)
+
+    def load_frame(self, issue_ids):
+        """Worklogs of the given issues as a DataFrame (issue_id, author, started, seconds)."""
+        with self._lock:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (issue_id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM wanted")
+            self.conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(str(i),) for i in issue_ids])
+            return pd.read_sql_query(
+                "SELECT w.issue_id, w.author, w.started, w.seconds FROM worklogs w JOIN wanted USING (issue_id)", self.conn)
+
+    def effort(self, issues, weeks=8, top=15):
+        """Hours spent against estimates, by issue, epic, person and week.
+
+        issues is a DataFrame with issue_id, key, summary, epic, estimate and
+        remaining (seconds), one row per project issue. Returns plain dicts
+        for the template.
+        """
+        logs = self.load_frame(issues['issue_id']).merge(issues[['issue_id', 'key']], on='issue_id')
+        spent = logs.groupby('key')['seconds'].sum()
+        per_issue = issues.assign(
+            epic=issues['epic'].fillna(NO_EPIC),
+            spent=issues['key'].map(spent).fillna(0),
+        )
+        by_epic = per_issue.groupby('epic')[['spent', 'estimate', 'remaining']].sum().sort_values('spent', ascending=False)
+        by_person = logs.groupby(logs['author'].fillna('Desconocido'))['seconds'].sum().sort_values(ascending=False)
+        week = pd.to_datetime(logs['started'], unit='s').dt.to_period('W').dt.start_time
+        by_week = logs.groupby(week)['seconds'].sum().sort_index().tail(weeks)
+        top_issues = per_issue[per_issue['spent'] > 0].nlargest(top, 'spent')
+
+        totals = per_issue[['spent', 'estimate', 'remaining']].sum()
+        projected = totals['spent'] + totals['remaining']
+        return {
+            "spent_hours": _hours(totals['spent']),
+            "estimate_hours": _hours(totals['estimate']),
+            "remaining_hours": _hours(totals['remaining']),
+            "projected_hours": _hours(projected),
+            # Positive when spent + remaining is over the original estimate
+            "variance_hours": _hours(projected - totals['estimate']),
+            "used_pct": int(totals['spent'] * 100 // totals['estimate']) if totals['estimate'] else None,
+            "by_epic": [{"epic": epic, "spent": _hours(r['spent']), "estimate": _hours(r['estimate']),
+                         "remaining": _hours(r['remaining'])} for epic, r in by_epic.iterrows()],
+            "by_person": [{"person": person, "hours": _hours(s)} for person, s in by_person.items()],
+            "by_week": [{"week": w.strftime("%Y-%m-%d"), "hours": _hours(s)} for w, s in by_week.items()],
+            "top_issues": [{"key": r['key'], "summary": r['summary'], "spent": _hours(r['spent']),
+                            "estimate": _hours(r['estimate'])} for _, r in top_issues.iterrows()],
+        }
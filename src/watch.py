@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+from run import load_config, get_jira_client
+from clients.fake_jira import FakeJiraClient
+from service.webhook_watcher import WebhookWatcher
+
+def main():
+    parser = argparse.ArgumentParser(description="SafetyMind webhook watch mode: re-renders reports when Jira issues change")
+    parser.add_argument("--project", nargs='+', help="Project(s) to watch (default: all in config/projects.yaml)")
+    parser.add_argument("--type", nargs='+', default=['kickoff', 'progress'], choices=['kickoff', 'progress', 'final', 'sprint'], help="Report types to keep current")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8090, help="Port to listen on")
+    parser.add_argument("--debounce", type=float, default=10, help="Quiet seconds after the last event before re-rendering a project")
+    parser.add_argument("--max-delay", type=float, default=50, help="Longest a pending change waits under continuous edits")
+    parser.add_argument("--secret", help="Require ?secret=<value> on webhook URLs")
+    parser.add_argument("--output-dir", default=".", help="Where reports are written")
+    parser.add_argument("--fake-jira", action="store_true", help="Watch synthetic issues instead of connecting to Jira")
+
+    args = parser.parse_args()
+
+    config = load_config()['projects']
+    if args.project:
+        missing = [p for p in args.project if p not in config]
+        if missing:
+            print(f"Project {', '.join(missing)} not found in config/projects.yaml")
+            return
+        config = {p: config[p] for p in args.project}
+    jira = FakeJiraClient(projects=[p['jira_key'] for p in config.values()]) if args.fake_jira else get_jira_client()
+
+    watcher = WebhookWatcher(jira, config, args.type, args.output_dir, args.debounce, args.max_delay, args.secret)
+    try:
+        asyncio.run(watcher.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = os.path.join(ROOT, 'templates')
+
+# Modules import each other from src/, as when the scripts are run from there
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.environ.setdefault('MPLBACKEND', 'Agg')
@@ -0,0 +1,55 @@
+import os
+import threading
+from storage.artifact_store import ArtifactStore
+
+def _objects(store):
+    return sorted(name for _, _, files in os.walk(store.objects_dir) for name in files)
+
+def test_same_day_editions_are_kept_apart(tmp_path):
+    store = ArtifactStore(str(tmp_path), keep=5)
+    store.record("P1", "progress", b"first", {"gantt.png": (b"chart", "image/png")})
+    latest = store.record("P1", "progress", b"second", {"gantt.png": (b"chart", "image/png")})
+    (newest, newest_date), (oldest, oldest_date) = store.editions("P1", "progress")
+    assert newest > oldest and newest_date == oldest_date
+    assert store.get(store.lookup("P1", "progress")) == b"second"
+    assert store.get(store.lookup("P1", "progress", oldest)) == b"first"
+    with open(latest, 'rb') as f:
+        assert f.read() == b"second"
+    # The shared chart is stored once
+    assert len(_objects(store)) == 3
+    store.close()
+
+def test_prune_collects_objects_nothing_references(tmp_path):
+    store = ArtifactStore(str(tmp_path), keep=2)
+    for n in range(4):
+        store.record("P1", "final", f"pdf {n}".encode(), {"gantt.png": (b"chart", "image/png")})
+    assert [store.get(store.lookup("P1", "final", e)) for e, _ in store.editions("P1", "final")] == [b"pdf 3", b"pdf 2"]
+    assert len(_objects(store)) == 3
+
+    stray = store.object_path("ab" * 32)
+    os.makedirs(os.path.dirname(stray), exist_ok=True)
+    for path in (stray, stray + ".123.tmp"):
+        with open(path, 'wb') as f:
+            f.write(b"orphan")
+    assert store.collect_garbage() == 1
+    assert len(_objects(store)) == 3
+    store.close()
+
+def test_concurrent_writers_never_lose_a_referenced_object(tmp_path):
+    def write(n):
+        store = ArtifactStore(str(tmp_path), keep=1)
+        for i in range(20):
+            # Every writer stores the same chart, so records and garbage collection race on one object
+            store.record(f"P{n}", "progress", f"pdf {n} {i}".encode(), {"gantt.png": (b"shared", "image/png")})
+        store.close()
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store = ArtifactStore(str(tmp_path))
+    for n in range(4):
+        assert store.get(store.lookup(f"P{n}", "progress", name="charts/gantt.png")) == b"shared"
+        assert store.get(store.lookup(f"P{n}", "progress")) == f"pdf {n} 19".encode()
+    store.close()
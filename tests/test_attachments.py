@@ -0,0 +1,58 @@
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from clients import attachments
+from clients.attachments import AttachmentCache
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        yield self.content
+
+class FakeSession:
+    def __init__(self, images):
+        self.images = images
+
+    def get(self, url, stream=False):
+        return FakeResponse(self.images[url])
+
+def _jpeg(color):
+    buf = io.BytesIO()
+    Image.new('RGB', (1600, 1200), color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+def test_thumbnails_are_made_by_workers_not_forked_from_a_thread(tmp_path, monkeypatch):
+    contexts = []
+
+    def pool(*args, **kwargs):
+        contexts.append(kwargs.get('mp_context'))
+        return ProcessPoolExecutor(*args, **kwargs)
+
+    monkeypatch.setattr(attachments, "ProcessPoolExecutor", pool)
+    monkeypatch.chdir(tmp_path)
+    images = {f"http://jira/att/{n}": _jpeg(color) for n, color in enumerate(["red", "blue"])}
+    found = [{"id": str(n), "size": len(body), "url": url, "filename": f"{n}.jpg", "issue": f"P-{n}"}
+             for n, (url, body) in enumerate(images.items())]
+    cache = AttachmentCache(base_dir="attachments")
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(cache.fetch(FakeSession(images), found)))
+    thread.start()
+    thread.join()
+
+    assert [c.get_start_method() for c in contexts] in (['forkserver'], ['spawn'])
+    assert len(results) == 2
+    for r in results:
+        with Image.open(r["thumbnail"][len("file://"):]) as thumb:
+            assert thumb.size == (480, 360)
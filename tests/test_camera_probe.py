@@ -0,0 +1,45 @@
+import socket
+import pytest
+from clients.camera_probe import CameraProbe
+
+def test_target_parsing():
+    probe = CameraProbe(port=554)
+    assert probe._target({"ip": "10.0.0.5"}) == ("10.0.0.5", 554)
+    assert probe._target({"ip": "10.0.0.5:8554"}) == ("10.0.0.5", 8554)
+    assert probe._target({"ip": "10.0.0.5", "port": 8000}) == ("10.0.0.5", 8000)
+    assert probe._target({"ip": "fe80::1"}) == ("fe80::1", 554)
+    assert probe._target({"ip": "[fe80::1]"}) == ("fe80::1", 554)
+    assert probe._target({"ip": "[fe80::1]:8554"}) == ("fe80::1", 8554)
+    assert probe._target({"name": "Sin dirección"}) is None
+    for camera in ({"ip": "10.0.0.5:rtsp"}, {"ip": "10.0.0.5", "port": "abc"}, {"ip": "10.0.0.5:70000"}):
+        with pytest.raises(ValueError):
+            probe._target(camera)
+
+def test_probe_all_merges_results_and_skips_cameras_without_address():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port, closed_port = listener.getsockname()[1], closed.getsockname()[1]
+    closed.close()
+    cameras = [{"name": "Cam 1", "ip": f"127.0.0.1:{port}"}, {"name": "Cam 2", "ip": f"127.0.0.1:{closed_port}"},
+               {"name": "Cam 3", "status": "Mantenimiento"}]
+    try:
+        results = CameraProbe(timeout=2).check(cameras)
+    finally:
+        listener.close()
+    assert [r["status"] for r in results] == ["Online", "Offline", "Mantenimiento"]
+    assert results[0]["latency_ms"] is not None and "checked_at" not in results[2]
+
+def test_camera_with_a_bad_port_is_reported_without_stopping_the_probe():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    cameras = [{"name": "Cam 1", "ip": "127.0.0.1", "port": "rtsp"}, {"name": "Cam 2", "ip": f"127.0.0.1:{listener.getsockname()[1]}"}]
+    try:
+        results = CameraProbe(timeout=2).check(cameras)
+    finally:
+        listener.close()
+    assert [r["status"] for r in results] == ["Mal configurada", "Online"]
+    assert "rtsp" in results[0]["error"] and "checked_at" not in results[0]
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from clients.cassette import Cassette, CassetteAdapter
+from clients.jira_client import JiraClient
+from reporting.report_context import ReportContext, progress_stores, close_stores
+
+PROJECT = {"jira_key": "GMF", "name": "Proyecto GMF"}
+STATUSES = {"To Do": "new", "In Progress": "indeterminate", "Done": "done"}
+
+def _issue(n, expand):
+    status = ["To Do", "In Progress", "Done"][n % 3]
+    issue = {
+        "id": str(10000 + n), "key": f"GMF-{n}", "self": f"/rest/api/2/issue/{10000 + n}",
+        "fields": {
+            "summary": f"Tarea {n}", "created": "2025-01-01T10:00:00.000+0000", "updated": f"2025-01-{n + 2:02d}T10:00:00.000+0000",
+            "status": {"name": status, "statusCategory": {"key": STATUSES[status]}},
+            "priority": {"name": "High" if n % 4 == 0 else "Medium"}, "duedate": "2025-02-01",
+            "resolutiondate": "2025-01-20T10:00:00.000+0000" if status == "Done" else None,
+        },
+    }
+    if expand == "changelog":
+        histories = [{"id": str(n), "created": "2025-01-10T10:00:00.000+0000",
+                      "items": [{"field": "status", "fromString": "To Do", "toString": status}]}] if status != "To Do" else []
+        issue["changelog"] = {"startAt": 0, "maxResults": 100, "total": len(histories), "histories": histories}
+    return issue
+
+class FakeJiraServer(BaseHTTPRequestHandler):
+    """Just enough of the Jira Server REST API for a progress report."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("/serverInfo"):
+            body = {"versionNumbers": [9, 12, 0], "deploymentType": "Server", "version": "9.12.0"}
+        elif url.path.endswith("/myself"):
+            body = {"displayName": "Recorder"}
+        elif url.path.endswith("/field"):
+            body = []
+        elif url.path.endswith("/search"):
+            start = int(query.get("startAt", 0))
+            issues = [_issue(n, query.get("expand")) for n in range(12)]
+            body = {"startAt": start, "maxResults": 100, "total": len(issues), "issues": issues[start:start + 100]}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def _progress(cassette, server_url):
+    client = JiraClient(server_url, "user", "token", CassetteAdapter(cassette))
+    assert client.connect()
+    stores = progress_stores(PROJECT["jira_key"])
+    try:
+        return ReportContext(client, PROJECT, **stores).build("progress")
+    finally:
+        close_stores(stores)
+
+def test_progress_run_replays_later_from_its_recording(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeJiraServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    path = str(tmp_path / "gmf.jsonl.gz")
+    try:
+        recorder = Cassette(path, "record")
+        recorder.meta["server"] = url
+        recorded = _progress(recorder, url)
+        recorder.save()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Hours later, offline, with the local stores already holding the recorded sync
+    later = time.time() + 3 * 3600
+    monkeypatch.setattr(time, "time", lambda: later)
+    replayer = Cassette(path, "replay")
+    replayed = _progress(replayer, replayer.meta["server"])
+
+    assert replayed["flow"] == recorded["flow"]
+    assert replayed["percentage"] == recorded["percentage"] == 33
+    assert replayer.meta["sync_state"]["changelog/GMF"][0] is None
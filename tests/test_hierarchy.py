@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+from reporting.hierarchy import IssueHierarchy
+
+def _issue(key, parent=None, done=False, type_='Story'):
+    status = SimpleNamespace(name='Done' if done else 'To Do',
+                             statusCategory=SimpleNamespace(key='done' if done else 'new'))
+    fields = SimpleNamespace(summary=key, status=status, issuetype=SimpleNamespace(name=type_),
+                             parent=SimpleNamespace(key=parent) if parent else None)
+    return SimpleNamespace(key=key, fields=fields)
+
+def test_rollup_counts_leaves_under_their_epic():
+    h = IssueHierarchy([_issue('E-1', type_='Epic'), _issue('S-1', 'E-1', done=True), _issue('S-2', 'E-1'),
+                        _issue('T-1', 'S-2', done=True), _issue('T-2', 'S-2')])
+    assert h.rollup()['E-1'] == (2.0, 3.0)
+    assert h.progress('S-2') == 50
+    assert h.epic_of()['T-2'] == 'E-1'
+
+def test_parent_cycle_is_broken_instead_of_dropped(capsys):
+    h = IssueHierarchy([_issue('E-1', type_='Epic'), _issue('A-1', 'A-3', done=True), _issue('A-2', 'A-1'),
+                        _issue('A-3', 'A-2'), _issue('A-4', 'A-2', done=True)])
+    assert 'A-1' in h.roots
+    assert h.progress('A-1') == 50
+    assert set(h.rollup()) == {'E-1', 'A-1', 'A-2', 'A-3', 'A-4'}
+    assert "Parent cycle" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+import pytest
+import requests
+from clients.jira_client import JiraClient
+from storage.worklog_store import WorklogStore
+
+class ResultPage(list):
+    def __init__(self, items, next_page_token=None):
+        super().__init__(items)
+        self.nextPageToken = next_page_token
+
+class PagedJira:
+    """Serves `total` issues in pages, by nextPageToken on Cloud and by startAt on Server/DC."""
+
+    def __init__(self, total, deployment_type):
+        self.issues = [SimpleNamespace(key=f"P-{n}") for n in range(total)]
+        self.deploymentType = deployment_type
+        self.calls = []
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, expand=None):
+        if self.deploymentType == 'Cloud' and startAt:
+            raise AssertionError("The `search` API is deprecated in Jira Cloud")
+        self.calls.append(('search', startAt))
+        return ResultPage(self.issues[startAt:startAt + maxResults])
+
+    def enhanced_search_issues(self, jql, nextPageToken=None, maxResults=50, fields=None, expand=None):
+        self.calls.append(('search/jql', nextPageToken))
+        start = int(nextPageToken or 0)
+        end = min(start + maxResults, len(self.issues))
+        return ResultPage(self.issues[start:end], str(end) if end < len(self.issues) else None)
+
+def _client(jira):
+    client = JiraClient("https://example.atlassian.net", "user", "token")
+    client.jira = jira
+    return client
+
+def test_cloud_pages_with_next_page_token():
+    jira = PagedJira(250, 'Cloud')
+    keys = [i.key for i in _client(jira).iter_issues('project = "P"', page_size=100)]
+    assert keys == [f"P-{n}" for n in range(250)]
+    assert jira.calls == [('search/jql', None), ('search/jql', '100'), ('search/jql', '200')]
+
+def test_server_pages_with_start_at():
+    jira = PagedJira(250, 'Server')
+    keys = [i.key for i in _client(jira).iter_issues('project = "P"', page_size=100)]
+    assert keys == [f"P-{n}" for n in range(250)]
+    assert jira.calls == [('search', 0), ('search', 100), ('search', 200)]
+
+class FailingWorklogJira:
+    """worklog/updated lists two IDs, then worklog/list answers with an error body."""
+
+    def __init__(self):
+        self._session = SimpleNamespace(post=self._post)
+
+    def _get_json(self, path, params=None):
+        return {"values": [{"worklogId": 1}, {"worklogId": 2}], "until": 1700000000000, "lastPage": True}
+
+    def _get_url(self, path):
+        return f"https://example.atlassian.net/rest/api/2/{path}"
+
+    def _post(self, url, data=None):
+        response = requests.Response()
+        response.status_code = 503
+        response.url = url
+        response._content = json.dumps([{"errorMessages": ["Service unavailable"]}]).encode()
+        return response
+
+def test_failed_worklog_batch_raises_before_the_watermark_moves(tmp_path):
+    store = WorklogStore(base_dir=str(tmp_path))
+    with pytest.raises(requests.HTTPError):
+        store.sync(_client(FailingWorklogJira()))
+    assert store.since() == 0
+    store.close()
@@ -0,0 +1,20 @@
+import base64
+import pathlib
+from reporting.assets import AssetRegistry
+from reporting.renderer import ASSETS_KEY, standalone_html
+
+def test_standalone_html_inlines_assets_and_local_files(tmp_path):
+    assets = AssetRegistry()
+    chart = assets.add("gantt.png", b"chart bytes")
+    thumb = tmp_path / "fotos de obra" / "cam1.jpg"
+    thumb.parent.mkdir()
+    thumb.write_bytes(b"jpeg bytes")
+    missing = (tmp_path / "missing.jpg").as_uri()
+    html = f'<img src="{chart}"><img src="{chart}"><img src="{thumb.as_uri()}"><img src="{missing}">'
+
+    out = standalone_html(html, {ASSETS_KEY: assets})
+    assert out.count(f'data:image/png;base64,{base64.b64encode(b"chart bytes").decode()}') == 2
+    assert f'data:image/jpeg;base64,{base64.b64encode(b"jpeg bytes").decode()}' in out
+    assert "asset:" not in out and str(pathlib.Path(thumb)) not in out
+    # Files that are gone are left as links
+    assert missing in out
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from datetime import datetime
+import pytest
+from conftest import TEMPLATES
+from clients.fake_jira import FakeJiraClient
+from reporting.renderer import render_html, template_environment
+from service import report_server
+from service.report_server import ReportService
+
+PROJECTS = {
+    key: {"jira_key": key, "name": f"Proyecto {key}", "description": "Descripción", "architecture_desc": "Arquitectura",
+          "cameras": [{"name": "Cam 1", "ip": "10.0.0.1", "telegram": "@alerts"}]}
+    for key in ("P1", "P2")
+}
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Replaces the WeasyPrint step: renders the template to HTML and records the thread it ran on."""
+    env = template_environment(TEMPLATES)
+    calls = []
+
+    def fake_render(template_name, context, env_=None, profile=None):
+        html = render_html(template_name, context, env)
+        calls.append((template_name, threading.current_thread().name))
+        return b"%PDF-" + html.encode()
+
+    monkeypatch.setattr(report_server, "render_pdf_bytes", fake_render)
+    return calls
+
+@pytest.fixture
+def service():
+    service = ReportService(FakeJiraClient(issues_per_project=40, base_date=datetime(2025, 1, 1)), PROJECTS, ttl=60)
+    yield service
+    service.close()
+
+def test_concurrent_requests_are_coalesced_and_built_on_one_thread(service, renders):
+    async def run():
+        return await asyncio.gather(
+            service.get_report("P1", "kickoff"),
+            service.get_report("P1", "kickoff"),
+            service.get_report("P2", "progress"),
+        )
+
+    first, second, other = asyncio.run(run())
+    assert first is second
+    assert first.startswith(b"%PDF-") and other.startswith(b"%PDF-")
+    assert service.stats == {"requests": 3, "builds": 2, "cache_hits": 0, "coalesced": 1}
+    assert {thread for _, thread in renders} == {"report-build_0"}
+
+def test_cached_report_is_served_without_rebuilding(service, renders):
+    async def run():
+        await service.get_report("P1", "final")
+        return await service.get_report("P1", "final")
+
+    assert asyncio.run(run()).startswith(b"%PDF-")
+    assert service.stats["builds"] == 1 and service.stats["cache_hits"] == 1
+    assert renders == [("final.html", "report-build_0")]
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), head.decode('latin-1'), body
+
+def test_http_routes(service, renders):
+    async def run():
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return [await _get(port, path) for path in
+                    ("/reports/P1/progress", "/reports/P9/progress", "/reports/P1/unknown", "/health")]
+
+    (ok, head, pdf), (missing, _, _), (unknown, _, _), (health, _, stats) = asyncio.run(run())
+    assert ok == 200 and "Content-Type: application/pdf" in head and pdf.startswith(b"%PDF-")
+    assert b"Proyecto P1" in pdf
+    assert missing == 404 and unknown == 404
+    assert health == 200 and b'"builds": 1' in stats
@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+from storage.snapshot_store import SnapshotStore
+
+def _row(key, done=0, points=1.0):
+    return {"key": key, "status": "Done" if done else "To Do", "done": done, "points": points,
+            "created": date(2025, 1, 1).toordinal(), "resolved": date(2025, 1, 3).toordinal() if done else None, "due": None}
+
+def test_empty_store_has_zero_series(tmp_path):
+    store = SnapshotStore("P1", base_dir=str(tmp_path))
+    start, end = date(2025, 1, 1), date(2025, 1, 31)
+    series = store.daily_series(start, end)
+    assert len(series) == 31 and series.to_numpy().sum() == 0
+    assert store.velocity(start, end).sum() == 0
+    store.close()
+
+def test_issue_gone_on_a_same_day_rerun_stops_counting(tmp_path):
+    store = SnapshotStore("P1", base_dir=str(tmp_path))
+    day = date(2025, 1, 10)
+    store.record([_row("P-1"), _row("P-2")], day - timedelta(days=1))
+    store.record([_row("P-1"), _row("P-2", done=1), _row("P-3")], day)
+    # Rerun the same day: P-2 (changed today) and P-3 (new today) are gone
+    store.record([_row("P-1")], day)
+
+    series = store.daily_series(day - timedelta(days=1), day + timedelta(days=1))
+    assert series["scope_count"].tolist() == [2, 1, 1]
+    assert series["done_count"].tolist() == [0, 0, 0]
+    store.close()
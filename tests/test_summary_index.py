@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from clients.fake_jira import FakeJiraClient
+from clients.jira_metadata import is_done
+from reporting.report_context import ReportContext
+from storage.summary_index import SummaryIndex
+
+class RecordingJira(FakeJiraClient):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queries = []
+
+    def iter_issues(self, jql, fields=None, page_size=100, expand=None):
+        self.queries.append(jql)
+        return super().iter_issues(jql, fields, page_size, expand)
+
+def test_reconcile_replaces_the_index_and_next_sync_is_incremental(tmp_path):
+    jira = RecordingJira(issues_per_project=30, base_date=datetime(2025, 1, 1))
+    index = SummaryIndex("P1", base_dir=str(tmp_path))
+    issues = jira.project_issues("P1")
+    # Both are gone from the project scan below
+    index.apply([issues[0], jira.project_issues("P2")[0]])
+
+    assert index.reconcile(issues[1:], time.time() - 120) == 29
+    assert index.totals()["total"] == 29
+    assert len(index.upcoming()) == sum(1 for i in issues[1:] if i.fields.status.statusCategory.key != 'done')
+    assert len(index.upcoming(5)) == 5
+
+    index.sync(jira)
+    # Relative bound (Jira reads absolute dates in the user's timezone): 2 minutes ago plus the overlap
+    assert jira.queries == ['project = "P1" AND updated >= "-7m"']
+    index.close()
+
+def test_reconcile_applies_only_changed_issues(tmp_path):
+    jira = FakeJiraClient(issues_per_project=30, base_date=datetime(2025, 1, 1))
+    issues = jira.project_issues("P1")
+    index = SummaryIndex("P1", base_dir=str(tmp_path))
+    assert index.reconcile(issues, time.time()) == 30
+    totals = index.totals()
+
+    assert index.reconcile(issues, time.time()) == 0
+    issues[3].fields.updated = "2099-01-01T00:00:00.000+0000"
+    assert index.reconcile(issues[1:], time.time()) == 1
+    assert index.totals()["total"] == totals["total"] - 1
+    assert issues[0].key not in index.issue_rows()
+    index.close()
+
+def test_reads_and_writes_from_two_threads(tmp_path):
+    jira = FakeJiraClient(issues_per_project=200, base_date=datetime(2025, 1, 1))
+    issues = jira.project_issues("P1")
+    index = SummaryIndex("P1", base_dir=str(tmp_path))
+    index.reconcile(issues, time.time())
+    errors = []
+
+    def write():
+        try:
+            for n in range(50):
+                index.apply(issues[n * 4:n * 4 + 4])
+                index.remove([issues[n].key])
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        while writer.is_alive():
+            index.counts()
+            index.critical(limit=20)
+            index.upcoming()
+    except Exception as e:
+        errors.append(e)
+    writer.join()
+    assert errors == []
+    assert index.totals()["total"] == 150
+    index.close()
+
+def test_index_and_issue_walk_agree_on_the_critical_path(tmp_path):
+    jira = FakeJiraClient(issues_per_project=60, base_date=datetime(2025, 1, 1))
+    issues = jira.project_issues("P1")
+    open_issues = [i for i in issues if not is_done(i.fields.status)]
+    today = date.today()
+    for issue in open_issues:
+        issue.fields.duedate = (today + timedelta(days=30)).isoformat()
+    # Due today is not overdue yet; due yesterday is
+    open_issues[0].fields.duedate = today.isoformat()
+    open_issues[0].fields.priority = SimpleNamespace(name="Medium")
+    open_issues[1].fields.duedate = (today - timedelta(days=1)).isoformat()
+    index = SummaryIndex("P1", base_dir=str(tmp_path))
+    index.reconcile(issues, time.time())
+    builder = ReportContext(jira, {"jira_key": "P1", "name": "P1"}, summary_index=index)
+
+    from_index = builder._summary_from_index()
+    from_issues = builder._summary_from_issues(issues)
+    as_set = lambda summary: sorted((c["key"], c["reason"]) for c in summary["critical_path"])
+    assert as_set(from_index) == as_set(from_issues)
+    assert from_index["critical_total"] == from_issues["critical_total"]
+    critical = {c["key"] for c in from_index["critical_path"]}
+    assert open_issues[1].key in critical
+    assert open_issues[0].key not in critical
+    index.close()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import pytest
+from conftest import ROOT, TEMPLATES
+from clients.fake_jira import FakeJiraClient
+from reporting.renderer import render_html, template_environment
+from service import webhook_watcher
+from service.webhook_watcher import WebhookWatcher, affected_types
+
+PAYLOADS = os.path.join(ROOT, 'payloads')
+PROJECTS = {"GMF": {"jira_key": "GMF", "name": "SafetyMind GMF Implementation", "description": "Descripción",
+                    "architecture_desc": "Arquitectura"}}
+
+def _payload(name):
+    with open(os.path.join(PAYLOADS, name), encoding='utf-8') as f:
+        return f.read().encode('utf-8')
+
+@pytest.fixture
+def renders(monkeypatch, tmp_path):
+    """Replaces the WeasyPrint step with rendering the template to HTML; records (template, output)."""
+    monkeypatch.chdir(tmp_path)  # SummaryIndex keeps its files under data/
+    env = template_environment(TEMPLATES)
+    calls = []
+
+    def fake_render(template_name, context, output_path, **kwargs):
+        render_html(template_name, context, env)
+        calls.append((template_name, os.path.basename(output_path)))
+
+    monkeypatch.setattr(webhook_watcher, "render_template", fake_render)
+    return calls
+
+async def _post(port, body, secret="s3cret"):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"POST /webhook?secret={secret} HTTP/1.1\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split()[1])
+
+def test_recorded_payloads_replay_against_fake_jira(renders, tmp_path):
+    watcher = WebhookWatcher(FakeJiraClient(), PROJECTS, ['kickoff', 'progress'], output_dir=str(tmp_path),
+                             debounce=0, max_delay=0, secret="s3cret")
+    watcher.load()
+    assert watcher.issues["GMF"]["GMF-7"].fields.status.name == 'To Do'
+    names = ("issue_updated.json", "issue_created.json", "issue_deleted.json", "issue_updated_labels.json")
+
+    async def run():
+        server = await asyncio.start_server(watcher.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            statuses = [await _post(port, _payload(name)) for name in names]
+            statuses.append(await _post(port, _payload("issue_updated.json"), secret="wrong"))
+            for _ in range(200):
+                if not watcher._pending and not watcher._timers:
+                    break
+                await asyncio.sleep(0.05)
+        # Let a render already handed to the render thread finish
+        watcher._executor.shutdown(wait=True)
+        return statuses
+
+    assert asyncio.run(run()) == [202, 202, 202, 202, 403]
+    issues = watcher.issues["GMF"]
+    assert issues["GMF-7"].fields.status.name == 'Done'
+    assert issues["GMF-201"].fields.summary == "Instalar cámara adicional en bodega"
+    assert "GMF-42" not in issues
+    assert watcher.stats["events"] == 4 and watcher.stats["applied"] == 3 and watcher.stats["ignored"] == 1
+    assert watcher.stats["failures"] == 0
+    assert {template for template, _ in renders} == {"kickoff.html", "progress.html"}
+
+    index = watcher.summaries["GMF"]
+    keys = {r[0] for r in index.conn.execute("SELECT key FROM issues")}
+    assert "GMF-201" in keys and "GMF-42" not in keys and len(keys) == len(issues)
+    assert index.conn.execute("SELECT done FROM issues WHERE key = 'GMF-7'").fetchone() == (1,)
+
+def test_payload_changelogs_select_report_types():
+    updated = json.loads(_payload("issue_updated.json"))
+    labels = json.loads(_payload("issue_updated_labels.json"))
+    assert affected_types(updated, ['kickoff', 'progress', 'final']) == {'kickoff', 'progress'}
+    assert affected_types(labels, ['kickoff', 'progress']) == set()
@@ -0,0 +1,25 @@
+from datetime import datetime
+import pandas as pd
+from clients.fake_jira import FakeJiraClient
+from storage.worklog_store import WorklogStore
+
+def test_sync_before_any_project_is_fetched_sees_its_worklogs(tmp_path):
+    jira = FakeJiraClient(issues_per_project=40, base_date=datetime(2025, 1, 1), projects=["P1"])
+    store = WorklogStore(base_dir=str(tmp_path))
+    assert store.sync(jira) > 0
+
+    issues = jira.project_issues("P1")
+    frame = pd.DataFrame({
+        "issue_id": [i.id for i in issues],
+        "key": [i.key for i in issues],
+        "summary": [i.fields.summary for i in issues],
+        "epic": [getattr(i.fields.parent, 'key', None) for i in issues],
+        "estimate": [i.fields.timeoriginalestimate for i in issues],
+        "remaining": [i.fields.timeestimate for i in issues],
+    })
+    effort = store.effort(frame)
+    assert effort["spent_hours"] > 0 and effort["by_person"]
+    # A second sync only re-applies the boundary records; the totals don't change
+    store.sync(jira)
+    assert store.effort(frame)["spent_hours"] == effort["spent_hours"]
+    store.close()